@@ -0,0 +1,117 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Memory benchmark: slotted, table-driven data points vs. __dict__ based ones.
+
+Builds a tree with a full-VSS number of leaves and reports the memory held by
+the tree and the construction time. Run with ``python bench_model_memory.py``.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from velocitas_sdk.model import (
+    DataPointBoolean,
+    DataPointFloat,
+    DataPointUint8Array,
+    Model,
+)
+
+BRANCHES = 500
+LEAVES_PER_BRANCH = 10
+REPEAT = 5
+
+# Generated models use string literals, so names are shared between trees.
+BRANCH_NAMES = [sys.intern(f"Branch{b}") for b in range(BRANCHES)]
+LEAF_NAMES = [sys.intern(f"Leaf{i}") for i in range(LEAVES_PER_BRANCH)]
+
+
+class LegacyNode:
+    """Layout of the former Node: plain instance attributes in a __dict__."""
+
+    def __init__(self, parent=None):
+        self.name = type(self).__name__
+        self.parent = parent
+
+
+class LegacyDataPoint(LegacyNode):
+    def __init__(self, name, parent):
+        super().__init__(parent)
+        self.name = name
+
+
+class LegacyDataPointFloat(LegacyDataPoint):
+    pass
+
+
+class LegacyDataPointBoolean(LegacyDataPoint):
+    pass
+
+
+class LegacyDataPointUint8Array(LegacyDataPoint):
+    pass
+
+
+LEGACY_LEAVES = (
+    LegacyDataPointFloat,
+    LegacyDataPointBoolean,
+    LegacyDataPointUint8Array,
+)
+LEAVES = (DataPointFloat, DataPointBoolean, DataPointUint8Array)
+
+
+def build(branch_type, leaf_types):
+    root = branch_type()
+    root.name = "Vehicle"
+    for branch_name in BRANCH_NAMES:
+        branch = branch_type(root)
+        branch.name = branch_name
+        setattr(root, branch_name, branch)
+        for i, leaf_name in enumerate(LEAF_NAMES):
+            leaf_type = leaf_types[i % len(leaf_types)]
+            setattr(branch, leaf_name, leaf_type(leaf_name, branch))
+    return root
+
+
+def measure(label, branch_type, leaf_types):
+    elapsed = float("inf")
+    for _ in range(REPEAT):
+        gc.collect()
+        start = time.perf_counter()
+        build(branch_type, leaf_types)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    tree = build(branch_type, leaf_types)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    leaves = BRANCHES * LEAVES_PER_BRANCH
+    print(
+        f"{label:>7}: {current / 1024:8.1f} KiB for {leaves} leaves "
+        f"({current / leaves:6.1f} B/leaf), built in {elapsed * 1e3:6.1f} ms"
+    )
+    return tree
+
+
+def main():
+    measure("legacy", LegacyNode, LEGACY_LEAVES)
+    measure("slotted", Model, LEAVES)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Startup benchmark: eager vs. lazy (LazyNode) construction of a vehicle model.
+
+Generates a full-size VSS-like model (about 5000 signals) in both styles and
+reports the time to define the classes ("import"), to create the root and to
+resolve the signals an app actually uses, plus the memory held afterwards.
+Run with ``python bench_model_startup.py``.
+"""
+
+import gc
+import time
+import tracemalloc
+
+from velocitas_sdk.model import DataPointBoolean, DataPointFloat, LazyNode, Model
+
+FAN_OUT = (10, 10, 10)  # branches per level
+LEAVES_PER_BRANCH = 5
+USED_SIGNALS = 20
+LEAF_TYPES = (DataPointFloat, DataPointBoolean)
+
+
+def _leaf_names():
+    return [f"Signal{i}" for i in range(LEAVES_PER_BRANCH)]
+
+
+def define_eager(level=0, prefix="Branch"):
+    """Branch classes creating all children in __init__, like generated models."""
+    if level == len(FAN_OUT):
+        children = [
+            (name, LEAF_TYPES[i % len(LEAF_TYPES)])
+            for i, name in enumerate(_leaf_names())
+        ]
+    else:
+        child_type = define_eager(level + 1, prefix)
+        children = [(f"{prefix}{i}", child_type) for i in range(FAN_OUT[level])]
+
+    def __init__(self, name, parent):
+        Model.__init__(self, parent)
+        self.name = name
+        for child_name, child_type in children:
+            setattr(self, child_name, child_type(child_name, self))
+
+    return type(f"Eager{level}", (Model,), {"__init__": __init__})
+
+
+def define_lazy(level=0, prefix="Branch"):
+    """The same tree declaring its children with LazyNode."""
+    if level == len(FAN_OUT):
+        attrs = {
+            name: LazyNode(LEAF_TYPES[i % len(LEAF_TYPES)])
+            for i, name in enumerate(_leaf_names())
+        }
+    else:
+        child_type = define_lazy(level + 1, prefix)
+        attrs = {f"{prefix}{i}": LazyNode(child_type) for i in range(FAN_OUT[level])}
+
+    def __init__(self, name, parent):
+        Model.__init__(self, parent)
+        self.name = name
+
+    attrs["__init__"] = __init__
+    return type(f"Lazy{level}", (Model,), attrs)
+
+
+def used_paths():
+    paths = []
+    for i in range(USED_SIGNALS):
+        segments = ["Vehicle"]
+        for level, fan_out in enumerate(FAN_OUT):
+            segments.append(f"Branch{(i * (level + 3)) % fan_out}")
+        segments.append(f"Signal{i % LEAVES_PER_BRANCH}")
+        paths.append(".".join(segments))
+    return paths
+
+
+def measure(label, define):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    root_type = define()
+    defined = time.perf_counter()
+    vehicle = root_type("Vehicle", None)
+    created = time.perf_counter()
+    for path in used_paths():
+        vehicle.getNode(path)
+    resolved = time.perf_counter()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:>5}: define {(defined - start) * 1e3:7.2f} ms, "
+        f"create {(created - defined) * 1e3:7.2f} ms, "
+        f"resolve {USED_SIGNALS} signals {(resolved - created) * 1e3:7.2f} ms, "
+        f"total {(resolved - start) * 1e3:7.2f} ms, held {current / 1024:8.1f} KiB"
+    )
+
+
+def main():
+    measure("eager", define_eager)
+    measure("lazy", define_lazy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Microbenchmark: cached Node.get_path() vs. walking the parent chain.
+
+Run with ``python bench_node_path.py``.
+"""
+
+import timeit
+import tracemalloc
+
+from velocitas_sdk.model import DataPointFloat, Model
+
+BRANCHES = 50
+LEAVES_PER_BRANCH = 10
+CALLS = 100
+
+
+class Branch(Model):
+    def __init__(self, name, parent):
+        super().__init__(parent)
+        self.name = name
+        for i in range(LEAVES_PER_BRANCH):
+            setattr(self, f"Leaf{i}", DataPointFloat(f"Leaf{i}", self))
+
+
+class Vehicle(Model):
+    def __init__(self):
+        super().__init__()
+        self.name = "Vehicle"
+        for i in range(BRANCHES):
+            cabin = Branch("Cabin", self)
+            setattr(self, f"Branch{i}", Branch(f"Branch{i}", cabin))
+
+
+def legacy_get_path(node) -> str:
+    """The former implementation, rebuilding the path on every call."""
+    path = [node.name]
+    node = node.parent
+    while node:
+        path.insert(0, node.name)
+        node = node.parent
+
+    return ".".join(path)
+
+
+def main():
+    vehicle = Vehicle()
+    leaves = [
+        getattr(getattr(vehicle, f"Branch{b}"), f"Leaf{i}")
+        for b in range(BRANCHES)
+        for i in range(LEAVES_PER_BRANCH)
+    ]
+
+    def run_legacy():
+        for leaf in leaves:
+            legacy_get_path(leaf)
+
+    def run_cached():
+        for leaf in leaves:
+            leaf.get_path()
+
+    for label, func in (("legacy", run_legacy), ("cached", run_cached)):
+        func()
+        seconds = timeit.timeit(func, number=CALLS)
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        per_call_ns = seconds / (CALLS * len(leaves)) * 1e9
+        print(f"{label:>7}: {per_call_ns:8.1f} ns/call, peak alloc {peak} B/round")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Microbenchmark: decoding and encoding float array data points as lists
+vs. as NumPy arrays (see velocitas_sdk.model.use_numpy_arrays).
+
+Run with ``python bench_numpy_arrays.py``; needs numpy.
+"""
+
+import timeit
+
+import numpy
+
+from velocitas_sdk import model
+from velocitas_sdk.model import DataPointDoubleArray, DataPointFloatArray
+
+ELEMENTS = 5000
+CALLS = 1000
+
+
+def main():
+    for datapoint_type in (DataPointFloatArray, DataPointDoubleArray):
+        codec = datapoint_type._type
+        values = numpy.random.default_rng(0).random(ELEMENTS)
+        datapoint = codec.encode(values.tolist())
+
+        model.use_numpy_arrays(False)
+        decode_list = timeit.timeit(lambda: codec.decode(datapoint), number=CALLS)
+        encode_list = timeit.timeit(lambda: codec.encode(values.tolist()), number=CALLS)
+        model.use_numpy_arrays(True)
+        decode_numpy = timeit.timeit(lambda: codec.decode(datapoint), number=CALLS)
+        encode_numpy = timeit.timeit(lambda: codec.encode(values), number=CALLS)
+        model.use_numpy_arrays(False)
+
+        name = datapoint_type.__name__
+        for label, seconds in (
+            ("decode list", decode_list),
+            ("decode numpy", decode_numpy),
+            ("encode list", encode_list),
+            ("encode numpy", encode_numpy),
+        ):
+            per_call_us = seconds / CALLS * 1e6
+            print(f"{name} {label:>12}: {per_call_us:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Microbenchmark: DataPointReply.get() dispatching to the data point's
+decoder vs. the former per-call dict of all 24 types.
+
+Run with ``python bench_reply_get.py``.
+"""
+
+import timeit
+
+from velocitas_sdk.model import DataPointFloat, DataPointFloatArray, Model
+from velocitas_sdk.proto.broker_pb2 import SubscribeReply
+from velocitas_sdk.proto.types_pb2 import Datapoint, FloatArray
+from velocitas_sdk.vdb.reply import DataPointReply
+from velocitas_sdk.vdb.types import TypedDataPointResult
+
+FIELDS = 10
+ARRAY_LENGTH = 16
+CALLS = 10000
+
+
+class Vehicle(Model):
+    def __init__(self):
+        super().__init__()
+        self.name = "Vehicle"
+        for i in range(FIELDS // 2):
+            setattr(self, f"Float{i}", DataPointFloat(f"Float{i}", self))
+            setattr(self, f"Array{i}", DataPointFloatArray(f"Array{i}", self))
+
+
+def legacy_get(reply: SubscribeReply, datapoint):
+    """The former implementation, decoding all fields on every call."""
+    datapoint_type = datapoint.__class__.__name__
+    vdb_datapoint = reply.fields[datapoint.get_path()]
+    datapoint_values = {
+        "DataPointBoolean": vdb_datapoint.bool_value,
+        "DataPointBooleanArray": list(vdb_datapoint.bool_array.values),
+        "DataPointString": vdb_datapoint.string_value,
+        "DataPointStringArray": list(vdb_datapoint.string_array.values),
+        "DataPointDouble": vdb_datapoint.double_value,
+        "DataPointDoubleArray": list(vdb_datapoint.double_array.values),
+        "DataPointFloat": vdb_datapoint.float_value,
+        "DataPointFloatArray": list(vdb_datapoint.float_array.values),
+        "DataPointInt8": vdb_datapoint.int32_value,
+        "DataPointInt8Array": list(vdb_datapoint.int32_array.values),
+        "DataPointInt16": vdb_datapoint.int32_value,
+        "DataPointInt16Array": list(vdb_datapoint.int32_array.values),
+        "DataPointInt32": vdb_datapoint.int32_value,
+        "DataPointInt32Array": list(vdb_datapoint.int32_array.values),
+        "DataPointInt64": vdb_datapoint.int64_value,
+        "DataPointInt64Array": list(vdb_datapoint.int64_array.values),
+        "DataPointUint8": vdb_datapoint.uint32_value,
+        "DataPointUint8Array": list(vdb_datapoint.uint32_array.values),
+        "DataPointUint16": vdb_datapoint.uint32_value,
+        "DataPointUint16Array": list(vdb_datapoint.uint32_array.values),
+        "DataPointUint32": vdb_datapoint.uint32_value,
+        "DataPointUint32Array": list(vdb_datapoint.uint32_array.values),
+        "DataPointUint64": vdb_datapoint.uint64_value,
+        "DataPointUint64Array": list(vdb_datapoint.uint64_array.values),
+    }
+    return TypedDataPointResult(
+        datapoint.get_path(),
+        datapoint_values[datapoint_type],
+        vdb_datapoint.timestamp,
+    )
+
+
+def main():
+    vehicle = Vehicle()
+    datapoints = [
+        getattr(vehicle, f"{kind}{i}")
+        for i in range(FIELDS // 2)
+        for kind in ("Float", "Array")
+    ]
+    fields = {}
+    for datapoint in datapoints:
+        if isinstance(datapoint, DataPointFloatArray):
+            array = FloatArray(values=[float(i) for i in range(ARRAY_LENGTH)])
+            fields[datapoint.get_path()] = Datapoint(float_array=array)
+        else:
+            fields[datapoint.get_path()] = Datapoint(float_value=1.0)
+    reply = SubscribeReply(fields=fields)
+    wrapper = DataPointReply(reply)
+
+    def run_legacy():
+        for datapoint in datapoints:
+            legacy_get(reply, datapoint)
+
+    def run_dispatch():
+        for datapoint in datapoints:
+            wrapper.get(datapoint)
+
+    for label, func in (("legacy", run_legacy), ("dispatch", run_dispatch)):
+        func()
+        seconds = timeit.timeit(func, number=CALLS)
+        per_call_us = seconds / (CALLS * len(datapoints)) * 1e6
+        print(f"{label:>8}: {per_call_us:6.2f} us/get")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from velocitas_sdk.proto.types_pb2 import Datapoint as BrokerDatapoint
+
+
+class DataPointCache:
+    """Latest values received on subscription streams, keyed by path.
+
+    Entries older than max_age seconds (measured from their arrival) are
+    treated as missing, so readers fall back to the broker.
+    """
+
+    def __init__(self, max_age: float = 1.0):
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._values: Dict[str, Tuple[float, BrokerDatapoint]] = {}
+
+    def update(self, fields: Mapping[str, BrokerDatapoint]):
+        received = time.monotonic()
+        for path, datapoint in fields.items():
+            self._values[path] = (received, datapoint)
+
+    def get(self, path: str) -> Optional[BrokerDatapoint]:
+        entry = self._values.get(path)
+        if entry is None or time.monotonic() - entry[0] > self.max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def invalidate(self, paths: Iterable[str]):
+        for path in paths:
+            self._values.pop(path, None)
+
+    def clear(self):
+        self._values.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._values), "hits": self.hits, "misses": self.misses}
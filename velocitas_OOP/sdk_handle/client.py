@@ -14,7 +14,7 @@
 
 import asyncio
 import logging
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from urllib.parse import urlparse
 
 import grpc
@@ -23,21 +23,44 @@ from velocitas_sdk import config
 from velocitas_sdk.proto.broker_pb2 import (
     GetDatapointsRequest,
     GetMetadataRequest,
+    SetDatapointsReply,
     SetDatapointsRequest,
     SubscribeRequest,
 )
-from velocitas_sdk.proto.broker_pb2_grpc import BrokerStub
+from velocitas_sdk.proto.collector_pb2 import RegisterDatapointsRequest
+from velocitas_sdk.vdb.cache import DataPointCache
+from velocitas_sdk.vdb.coalescing import WriteCoalescer
+from velocitas_sdk.vdb.hedging import HedgedReads
+from velocitas_sdk.vdb.metadata import MetadataCache
+from velocitas_sdk.vdb.metrics import RpcMetrics, metrics_interceptors
+from velocitas_sdk.vdb.pool import ROUND_ROBIN, ChannelPool
+from velocitas_sdk.vdb.ratelimit import BULK, CRITICAL, NORMAL, WriteRateLimiter
+from velocitas_sdk.vdb.reconnect import CircuitBreaker
+from velocitas_sdk.vdb.singleflight import SingleFlight
+from velocitas_sdk.vdb.suppression import ChangeSuppressor
 
 logger = logging.getLogger(__name__)
 
 
 class VehicleDataBrokerClient:
     """VehicleDataBrokerClient provides the Graph API to access vehicle services
-    and vehicle signals."""
+    and vehicle signals.
+
+    The client is a singleton; the arguments of the first instantiation
+    configure it. With channels > 1 the calls are spread over a pool of
+    connections, see ChannelPool for the selection strategies. With
+    metrics=True the calls of all channels are recorded in RpcMetrics.
+    """
 
     _instance = None
 
-    def __new__(cls, port: Optional[int] = None):
+    def __new__(
+        cls,
+        port: Optional[int] = None,
+        channels: int = 1,
+        selection: str = ROUND_ROBIN,
+        metrics: bool = False,
+    ):
         if cls._instance is None:
             cls._instance = super(VehicleDataBrokerClient, cls).__new__(cls)
             service_locator = config.middleware.service_locator
@@ -49,30 +72,216 @@ class VehicleDataBrokerClient:
                 _port = port
 
             _address = f"{_hostname}:{_port}"
-            cls._channel = grpc.aio.insecure_channel(_address)  # type: ignore
+            cls._metrics = RpcMetrics() if metrics else None
+            interceptors = metrics_interceptors(cls._metrics) if metrics else None
+            cls._pool = ChannelPool(_address, channels, selection, interceptors)
+            cls._channel = cls._pool.channels[0]
 
             metadata = service_locator.get_metadata("vehicledatabroker")
             cls._metadata = metadata
 
-            cls._stub = BrokerStub(cls._channel)
+            cls._stub = cls._pool.stubs[0]
+            cls._value_cache = None
+            cls._write_coalescer = None
+            cls._change_suppressor = None
+            cls._hedged_reads = None
+            cls._single_flight = None
+            cls._metadata_cache = None
+            cls._rate_limiter = None
+            cls._write_priorities = {}
+            cls._circuit_breaker = CircuitBreaker()
+            cls._timeouts = {
+                "GetDatapoints": None,
+                "SetDatapoints": None,
+                "GetMetadata": None,
+                "RegisterDatapoints": None,
+            }
         return cls._instance
 
+    @property
+    def timeouts(self) -> Dict[str, Optional[float]]:
+        return dict(self._timeouts)
+
+    def set_timeout(self, method: str, timeout: Optional[float]):
+        """Set the deadline in seconds for each call of a unary broker method
+        (GetDatapoints, SetDatapoints, GetMetadata or RegisterDatapoints);
+        None waits forever."""
+        if method not in self._timeouts:
+            raise ValueError(f"No deadline can be set for method '{method}'")
+        self._timeouts[method] = timeout
+
+    @property
+    def metrics(self) -> Optional[RpcMetrics]:
+        """Metrics of the broker calls, None unless created with metrics=True."""
+        return self._metrics
+
+    @property
+    def hedged_reads(self) -> Optional[HedgedReads]:
+        return self._hedged_reads
+
+    def enable_hedged_reads(
+        self, percentile: float = 0.95, initial_delay: float = 0.05
+    ) -> HedgedReads:
+        """Hedge GetDatapoints calls slower than the given latency percentile
+        with a second request."""
+        type(self)._hedged_reads = HedgedReads(percentile, initial_delay)
+        return self._hedged_reads  # type: ignore
+
+    def disable_hedged_reads(self):
+        type(self)._hedged_reads = None
+
+    @property
+    def single_flight(self) -> Optional[SingleFlight]:
+        return self._single_flight
+
+    def enable_single_flight(self) -> SingleFlight:
+        """Let concurrent GetDatapoints calls for the same set of paths share
+        one in-flight request and its response."""
+        if self._single_flight is None:
+            type(self)._single_flight = SingleFlight()
+        return self._single_flight
+
+    def disable_single_flight(self):
+        type(self)._single_flight = None
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Breaker gating the reconnects of all subscription streams."""
+        return self._circuit_breaker
+
+    @property
+    def value_cache(self) -> Optional[DataPointCache]:
+        """Cache of subscribed values, None unless enabled."""
+        return self._value_cache
+
+    def enable_value_cache(self, max_age: float = 1.0) -> DataPointCache:
+        """Serve DataPoint.get() from values received on subscriptions
+        without WHERE conditions when they are not older than max_age
+        seconds."""
+        if self._value_cache is None:
+            type(self)._value_cache = DataPointCache(max_age)
+        else:
+            self._value_cache.max_age = max_age
+        return self._value_cache
+
+    def disable_value_cache(self):
+        type(self)._value_cache = None
+
+    def enable_write_coalescing(self, window: float = 0.0) -> WriteCoalescer:
+        """Merge SetDatapoints calls issued within window seconds (or within
+        the same event loop iteration for 0) into one request."""
+        if self._write_coalescer is None:
+            type(self)._write_coalescer = WriteCoalescer(self._set_datapoints, window)
+        else:
+            self._write_coalescer.window = window
+        return self._write_coalescer
+
+    def disable_write_coalescing(self):
+        type(self)._write_coalescer = None
+
+    @property
+    def change_suppressor(self) -> Optional[ChangeSuppressor]:
+        """Filter of unchanged writes, None unless enabled."""
+        return self._change_suppressor
+
+    def enable_change_suppression(self) -> ChangeSuppressor:
+        """Skip writes of unchanged values for the paths watched by the
+        returned ChangeSuppressor, see DataPoint.suppress_unchanged()."""
+        if self._change_suppressor is None:
+            type(self)._change_suppressor = ChangeSuppressor()
+        return self._change_suppressor
+
+    def disable_change_suppression(self):
+        type(self)._change_suppressor = None
+
+    @property
+    def metadata_cache(self) -> Optional[MetadataCache]:
+        """Metadata used to validate writes locally, None unless enabled."""
+        return self._metadata_cache
+
+    async def enable_metadata_validation(
+        self, names: Optional[List[str]] = None
+    ) -> MetadataCache:
+        """Fetch the metadata of the given paths (all for None) in one call and
+        check DataPoint.set() and BatchSetBuilder.add() values against it.
+        Call again, or refresh() the returned cache, to pick up changes."""
+        cache = self._metadata_cache or MetadataCache()
+        await cache.refresh(self, names)
+        type(self)._metadata_cache = cache
+        return cache
+
+    def disable_metadata_validation(self):
+        type(self)._metadata_cache = None
+
+    @property
+    def rate_limiter(self) -> Optional[WriteRateLimiter]:
+        """Limiter of SetDatapoints calls, None unless enabled."""
+        return self._rate_limiter
+
+    def enable_rate_limiting(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        path_rate: Optional[float] = None,
+        path_burst: Optional[float] = None,
+    ) -> WriteRateLimiter:
+        """Limit SetDatapoints to rate calls per second of the client and
+        path_rate writes per second of each path, None for no limit."""
+        type(self)._rate_limiter = WriteRateLimiter(rate, burst, path_rate, path_burst)
+        return self._rate_limiter  # type: ignore
+
+    def disable_rate_limiting(self):
+        type(self)._rate_limiter = None
+
+    def set_write_priority(self, path: str, priority: int):
+        """Send writes of the path in the CRITICAL, NORMAL or BULK lane.
+        CRITICAL writes bypass the rate limiter and write coalescing."""
+        if priority not in (CRITICAL, NORMAL, BULK):
+            raise ValueError(f"Unknown write priority {priority}")
+        self._write_priorities[path] = priority
+
+    def write_priority(self, paths: Iterable[str]) -> int:
+        """Lane of a write: the highest priority of its paths."""
+        return min(
+            (self._write_priorities.get(path, NORMAL) for path in paths),
+            default=NORMAL,
+        )
+
     async def close(self):
-        """Closes runtime gRPC channel."""
-        if self._channel:
-            await self._channel.close()  # type: ignore
+        """Closes runtime gRPC channel. The client stays the singleton with
+        its configuration, so it cannot be used afterwards."""
+        if self._pool:
+            await self._pool.close()
 
     def __enter__(self) -> "VehicleDataBrokerClient":
         return self
 
     def __exit__(self, exc_type, exc_value, traceback) -> None:
-        asyncio.run_coroutine_threadsafe(self.close(), asyncio.get_event_loop())
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sync code: no loop runs in this thread.
+            asyncio.run(self.close())
+        else:
+            type(self)._closing = loop.create_task(self.close())
+
+    async def __aenter__(self) -> "VehicleDataBrokerClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
 
     async def GetDatapoints(self, datapoints: List[str]):
         try:
-            response = await self._stub.GetDatapoints(
-                GetDatapointsRequest(datapoints=datapoints), metadata=self._metadata
-            )
+            request = GetDatapointsRequest(datapoints=datapoints)
+            if self._single_flight is not None:
+                response = await self._single_flight.call(
+                    frozenset(datapoints), lambda: self._read_datapoints(request)
+                )
+            else:
+                response = await self._read_datapoints(request)
+            if self._change_suppressor is not None:
+                self._change_suppressor.observe(response.datapoints)
             return response
         except grpc.aio.AioRpcError:  # type: ignore
             logger.exception(
@@ -80,11 +289,58 @@ class VehicleDataBrokerClient:
             )
             raise
 
-    async def SetDatapoints(self, datapoints):
-        try:
-            response = await self._stub.SetDatapoints(
-                SetDatapointsRequest(datapoints=datapoints), metadata=self._metadata
+    def _read_datapoints(self, request: GetDatapointsRequest):
+        if self._hedged_reads is not None:
+            return self._hedged_reads.call(lambda: self._get_datapoints(request))
+        return self._get_datapoints(request)
+
+    async def _get_datapoints(self, request: GetDatapointsRequest):
+        with self._pool.unary() as stub:
+            return await stub.GetDatapoints(
+                request,
+                metadata=self._metadata,
+                timeout=self._timeouts["GetDatapoints"],
             )
+
+    async def SetDatapoints(self, datapoints, priority: Optional[int] = None):
+        if self._change_suppressor is not None:
+            datapoints = self._change_suppressor.filter(datapoints)
+            if not datapoints:
+                return SetDatapointsReply()
+        if priority is None:
+            priority = self.write_priority(datapoints)
+        if self._rate_limiter is not None:
+            # Copied, as a CRITICAL write may remove paths while it waits.
+            datapoints = dict(datapoints)
+            await self._rate_limiter.acquire(datapoints, priority)
+            if not datapoints:
+                return SetDatapointsReply()
+        if self._write_coalescer is not None:
+            if priority != CRITICAL:
+                return await self._write_coalescer.set(datapoints)
+            # Pending older values must not overwrite this write.
+            self._write_coalescer.supersede(datapoints)
+        return await self._set_datapoints(datapoints)
+
+    async def _set_datapoints(self, datapoints):
+        try:
+            with self._pool.unary() as stub:
+                response = await stub.SetDatapoints(
+                    SetDatapointsRequest(datapoints=datapoints),
+                    metadata=self._metadata,
+                    timeout=self._timeouts["SetDatapoints"],
+                )
+            if self._value_cache is not None:
+                # Read your own writes: the next get goes to the broker.
+                self._value_cache.invalidate(datapoints)
+            if self._change_suppressor is not None:
+                self._change_suppressor.observe(
+                    {
+                        path: datapoint
+                        for path, datapoint in datapoints.items()
+                        if path not in response.errors
+                    }
+                )
             return response
         except grpc.aio.AioRpcError:  # type: ignore
             logger.exception(
@@ -94,7 +350,7 @@ class VehicleDataBrokerClient:
 
     def Subscribe(self, query: str):
         try:
-            response = self._stub.Subscribe(
+            response = self._pool.subscribe(
                 SubscribeRequest(query=query),
                 metadata=self._metadata,
             )
@@ -107,9 +363,12 @@ class VehicleDataBrokerClient:
 
     async def GetMetadata(self, names: list):
         try:
-            response = await self._stub.GetMetadata(
-                GetMetadataRequest(names=names), metadata=self._metadata
-            )
+            with self._pool.unary() as stub:
+                response = await stub.GetMetadata(
+                    GetMetadataRequest(names=names),
+                    metadata=self._metadata,
+                    timeout=self._timeouts["GetMetadata"],
+                )
             return response
         except grpc.aio.AioRpcError:  # type: ignore
             logger.exception(
@@ -117,3 +376,30 @@ class VehicleDataBrokerClient:
             )
             raise
 
+    async def RegisterDatapoints(self, registrations: list):
+        """Register data points of a feeder with the Collector service; the
+        reply maps their names to the ids used by StreamDatapoints."""
+        try:
+            with self._pool.unary(self._pool.collector_stubs) as stub:
+                response = await stub.RegisterDatapoints(
+                    RegisterDatapointsRequest(list=registrations),
+                    metadata=self._metadata,
+                    timeout=self._timeouts["RegisterDatapoints"],
+                )
+            return response
+        except grpc.aio.AioRpcError:  # type: ignore
+            logger.exception(
+                "Error occured in VehicleDataBrokerClient.RegisterDatapoints",
+            )
+            raise
+
+    def StreamDatapoints(self):
+        """Open a Collector StreamDatapoints stream, see DataPointFeeder."""
+        try:
+            return self._pool.stream_datapoints(metadata=self._metadata)
+        except grpc.aio.AioRpcError:  # type: ignore
+            logger.exception(
+                "Error occured in VehicleDataBrokerClient.StreamDatapoints",
+            )
+            raise
+
@@ -0,0 +1,112 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from typing import (
+    Awaitable,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from velocitas_sdk.proto.broker_pb2 import SetDatapointsReply
+from velocitas_sdk.proto.types_pb2 import Datapoint as BrokerDatapoint
+
+SendFunction = Callable[[Dict[str, BrokerDatapoint]], Awaitable[SetDatapointsReply]]
+
+
+class WriteCoalescer:
+    """Merges SetDatapoints calls issued within a short window into a single
+    request. A window of 0 merges the calls of the same event loop iteration.
+
+    A later value for a path replaces an earlier one, and every caller
+    receives a reply holding the errors reported for its own paths.
+    supersede() drops pending values of paths written around the
+    coalescer.
+    """
+
+    def __init__(self, send: SendFunction, window: float = 0.0):
+        self.window = window
+        self.calls = 0
+        self.requests = 0
+        self._send = send
+        self._pending: Dict[str, BrokerDatapoint] = {}
+        self._waiters: List[Tuple[List[str], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def set(self, datapoints: Mapping[str, BrokerDatapoint]):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.calls += 1
+        self._pending.update(datapoints)
+        self._waiters.append((list(datapoints), future))
+        if self._flush_handle is None:
+            if self.window > 0:
+                self._flush_handle = loop.call_later(self.window, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+        return await future
+
+    def supersede(self, paths: Collection[str]):
+        for path in paths:
+            self._pending.pop(path, None)
+
+    def _flush(self):
+        self._flush_handle = None
+        datapoints, self._pending = self._pending, {}
+        waiters, self._waiters = self._waiters, []
+        if not datapoints:
+            # Every value was superseded.
+            for _, future in waiters:
+                if not future.done():
+                    future.set_result(SetDatapointsReply())
+            return
+        self.requests += 1
+        task = asyncio.ensure_future(self._send_batch(datapoints, waiters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, datapoints, waiters):
+        try:
+            response = await self._send(datapoints)
+        except asyncio.CancelledError:
+            for _, future in waiters:
+                future.cancel()
+            raise
+        except Exception as ex:
+            for _, future in waiters:
+                if not future.done():
+                    future.set_exception(ex)
+            return
+
+        if len(waiters) == 1:
+            _, future = waiters[0]
+            if not future.done():
+                future.set_result(response)
+            return
+
+        for paths, future in waiters:
+            if not future.done():
+                errors = {
+                    path: response.errors[path]
+                    for path in paths
+                    if path in response.errors
+                }
+                future.set_result(SetDatapointsReply(errors=errors))
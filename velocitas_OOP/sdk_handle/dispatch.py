@@ -0,0 +1,135 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+from velocitas_sdk.proto.broker_pb2 import SubscribeReply
+from velocitas_sdk.proto.types_pb2 import Datapoint as BrokerDatapoint
+
+# Policies of a full DispatchQueue.
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+CONFLATE = "conflate"
+
+
+class DispatchQueue:
+    """Queue between the stream of a subscription and its callback, which
+    then runs in a task of its own, so a slow callback does not hold up the
+    stream.
+
+    With BLOCK, the stream waits while maxsize replies are queued. The
+    stream of a query is shared by all subscriptions of the query, so this
+    holds back their callbacks as well; subscribe with a query of its own
+    where that is not wanted. With DROP_OLDEST, the oldest queued reply is
+    dropped for a new one. With CONFLATE, only the latest value of each path
+    is kept and the callback gets one reply of all paths updated since its
+    last call; maxsize does not apply as the queue holds at most one value
+    per subscribed path. Replies or values not delivered are counted as
+    dropped. A closed queue ignores new replies and releases a stream
+    waiting for room.
+
+    await model.Speed.subscribe(on_speed, queue=DispatchQueue(CONFLATE))
+    """
+
+    def __init__(self, policy: str = CONFLATE, maxsize: int = 100):
+        if policy not in (BLOCK, DROP_OLDEST, CONFLATE):
+            raise ValueError(f"Unknown dispatch queue policy '{policy}'")
+        if maxsize < 1:
+            raise ValueError(f"Dispatch queue size must be at least 1, got {maxsize}")
+        self.policy = policy
+        self.maxsize = maxsize
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._replies: Deque[SubscribeReply] = deque()
+        self._latest: Dict[str, BrokerDatapoint] = {}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        if self.policy == CONFLATE:
+            return len(self._latest)
+        return len(self._replies)
+
+    async def put(self, reply: SubscribeReply):
+        if self._closed:
+            return
+        self.received += 1
+        if self.policy == CONFLATE:
+            for path, datapoint in reply.fields.items():
+                if path in self._latest:
+                    self.dropped += 1
+                self._latest[path] = datapoint
+        else:
+            if self.policy == DROP_OLDEST and len(self._replies) >= self.maxsize:
+                self._replies.popleft()
+                self.dropped += 1
+            while len(self._replies) >= self.maxsize:
+                self._not_full.clear()
+                await self._not_full.wait()
+                if self._closed:
+                    self.dropped += 1
+                    return
+            self._replies.append(reply)
+        self.max_depth = max(self.max_depth, self.depth)
+        self._not_empty.set()
+
+    def _take(self) -> SubscribeReply:
+        if self.policy == CONFLATE:
+            fields, self._latest = self._latest, {}
+            return SubscribeReply(fields=fields)
+        reply = self._replies.popleft()
+        self._not_full.set()
+        return reply
+
+    def start(self, deliver: Callable[[SubscribeReply], Awaitable], name: str):
+        """Start delivering queued replies with deliver() unless running."""
+        self._closed = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(deliver), name=name)
+
+    def close(self):
+        """Stop delivering; queued replies are kept for a restart."""
+        self._closed = True
+        self._not_full.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, deliver: Callable[[SubscribeReply], Awaitable]):
+        while True:
+            if not self.depth:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+            reply = self._take()
+            self.delivered += 1
+            await deliver(reply)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
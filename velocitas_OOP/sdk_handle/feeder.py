@@ -0,0 +1,250 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import grpc
+
+from velocitas_sdk.proto.collector_pb2 import (
+    RegistrationMetadata,
+    StreamDatapointsRequest,
+)
+from velocitas_sdk.proto.types_pb2 import CONTINUOUS
+from velocitas_sdk.proto.types_pb2 import Datapoint as BrokerDatapoint
+from velocitas_sdk.proto.types_pb2 import DatapointError
+from velocitas_sdk.vdb.client import VehicleDataBrokerClient
+from velocitas_sdk.vdb.reconnect import ExponentialBackoff
+
+logger = logging.getLogger(__name__)
+
+
+class DataPointFeeder:
+    """Provides data point values to the broker over the Collector API.
+
+    Data points are registered once and their ids are cached. update() only
+    queues a value; a background task writes the queue to one long-lived
+    StreamDatapoints stream, packing the values queued while the previous
+    message was written into the next one. A message holds at most max_batch
+    values and one value per data point: a newer value of a data point goes
+    into the next message, or replaces the queued one with conflate=True.
+    Up to max_pending messages are queued, beyond that the oldest are
+    dropped.
+
+    A broken stream is reopened with jittered backoff after registering the
+    data points again, as a restarted broker hands out new ids:
+
+    async with DataPointFeeder() as feeder:
+        await feeder.register(vehicle.Speed, vehicle.Acceleration.Longitudinal)
+        while True:
+            feeder.update(vehicle.Speed, read_speed())
+            await asyncio.sleep(0.001)
+    """
+
+    def __init__(
+        self,
+        vdb_client: Optional[VehicleDataBrokerClient] = None,
+        max_batch: int = 1000,
+        max_pending: int = 10000,
+        conflate: bool = False,
+        backoff: Optional[ExponentialBackoff] = None,
+    ):
+        self._client = vdb_client
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.conflate = conflate
+        self.backoff = backoff or ExponentialBackoff()
+        self._registrations: Dict[str, RegistrationMetadata] = {}
+        self._ids: Dict[str, int] = {}
+        self._paths: Dict[int, str] = {}
+        self._batches: Deque[Dict[str, BrokerDatapoint]] = deque()
+        self._ready = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._registered = True
+        self._task: Optional[asyncio.Task] = None
+        # Failed attempts to stream since a message was last written.
+        self._attempt = 0
+        self.messages = 0
+        self.values = 0
+        self.dropped = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.last_errors: Dict[str, int] = {}
+
+    @property
+    def client(self) -> VehicleDataBrokerClient:
+        if self._client is None:
+            self._client = VehicleDataBrokerClient()
+        return self._client
+
+    def id_of(self, path: str) -> Optional[int]:
+        return self._ids.get(path)
+
+    async def register(self, *datapoints, change_type: int = CONTINUOUS):
+        """Register the typed data points not registered yet in one call and
+        start streaming. Returns the ids of all given data points."""
+        new = {}
+        for datapoint in datapoints:
+            path = datapoint.get_path()
+            if path not in self._registrations:
+                new[path] = RegistrationMetadata(
+                    name=path, data_type=datapoint.data_type, change_type=change_type
+                )
+        if new:
+            await self._register(new.values())
+            self._registrations.update(new)
+        self.start()
+        return {path: self._ids[path] for path in (d.get_path() for d in datapoints)}
+
+    async def _register(self, registrations):
+        response = await self.client.RegisterDatapoints(list(registrations))
+        for path, id_ in response.results.items():
+            self._ids[path] = id_
+            self._paths[id_] = path
+
+    def update(self, datapoint, value):
+        """Queue a value of a registered data point, timestamped now."""
+        path = datapoint.get_path()
+        if path not in self._registrations:
+            raise ValueError(f"Data point {path} is not registered")
+        encoded = datapoint.create_broker_data_point(value)
+        encoded.timestamp.GetCurrentTime()
+
+        batch = self._batches[-1] if self._batches else None
+        if (
+            batch is None
+            or (path in batch and not self.conflate)
+            or len(batch) >= self.max_batch
+        ):
+            if len(self._batches) >= self.max_pending:
+                self.dropped += len(self._batches.popleft())
+            batch = {}
+            self._batches.append(batch)
+        batch[path] = encoded
+        self._drained.clear()
+        self._ready.set()
+
+    async def flush(self):
+        """Wait until all queued values are written to the stream."""
+        await self._drained.wait()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": sum(len(batch) for batch in self._batches),
+            "messages": self.messages,
+            "values": self.values,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="DataPointFeeder")
+
+    async def close(self):
+        """Stop streaming; values still queued are discarded."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> "DataPointFeeder":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def _run(self):
+        while True:
+            try:
+                if not self._registered:
+                    await self._register(self._registrations.values())
+                    self._registered = True
+                await self._stream()
+            except asyncio.CancelledError:
+                raise
+            except (grpc.aio.AioRpcError, Exception):  # type: ignore
+                logger.exception("Error occured in DataPointFeeder.stream")
+                self._registered = False
+                self.reconnects += 1
+                delay = self.backoff.delay(self._attempt)
+                self._attempt += 1
+                logger.debug("Retrying after %.2f seconds", delay)
+                await asyncio.sleep(delay)
+
+    async def _stream(self):
+        call = self.client.StreamDatapoints()
+        reader = asyncio.create_task(self._read_replies(call))
+        try:
+            while True:
+                if not self._batches:
+                    self._ready.clear()
+                    self._drained.set()
+                    await self._wait_ready(reader)
+                    continue
+                batch = self._batches.popleft()
+                request = StreamDatapointsRequest(
+                    datapoints={
+                        self._ids[path]: datapoint for path, datapoint in batch.items()
+                    }
+                )
+                try:
+                    await call.write(request)
+                except BaseException:
+                    self._batches.appendleft(batch)
+                    raise
+                self._attempt = 0
+                self.messages += 1
+                self.values += len(batch)
+        finally:
+            reader.cancel()
+            if reader.done() and not reader.cancelled():
+                # Retrieved here, the error surfaced through the write.
+                reader.exception()
+            call.cancel()
+
+    async def _wait_ready(self, reader: asyncio.Task):
+        """Wait for values to stream, or raise once the broker ended the
+        stream so that an idle feeder reconnects right away."""
+        ready = asyncio.ensure_future(self._ready.wait())
+        try:
+            await asyncio.wait((ready, reader), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            ready.cancel()
+        if reader.done():
+            reader.result()
+            raise ConnectionError("Broker ended the StreamDatapoints stream")
+
+    async def _read_replies(self, call):
+        while True:
+            reply = await call.read()
+            if reply is grpc.aio.EOF:  # type: ignore
+                return
+            for id_, error in reply.errors.items():
+                path = self._paths.get(id_, str(id_))
+                self.errors += 1
+                self.last_errors[path] = error
+                logger.warning(
+                    "Broker rejected value of %s: %s",
+                    path,
+                    DatapointError.Name(error),
+                )
+
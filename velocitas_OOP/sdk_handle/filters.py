@@ -0,0 +1,132 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from velocitas_sdk.proto.types_pb2 import Datapoint as BrokerDatapoint
+
+_NUMERIC = frozenset(
+    (
+        "int32_value",
+        "int64_value",
+        "uint32_value",
+        "uint64_value",
+        "float_value",
+        "double_value",
+    )
+)
+
+
+class DeliveryFilter:
+    """Decides which replies of a subscription reach its callback.
+
+    With a deadband, a reply is delivered only if a numeric value moved by
+    more than deadband, or by more than relative_deadband times its
+    magnitude, from the value last delivered; other values are delivered
+    when they change. With min_interval, replies arriving sooner than
+    min_interval seconds after the last delivered one are held back: the
+    latest held value of each path is delivered with the next reply, or by
+    flush() once the interval has passed, so the last value is not lost. A
+    filter keeps the state of one subscription.
+    """
+
+    def __init__(
+        self,
+        deadband: Optional[float] = None,
+        relative_deadband: Optional[float] = None,
+        min_interval: Optional[float] = None,
+    ):
+        if deadband is not None and relative_deadband is not None:
+            raise ValueError("Only one of deadband and relative_deadband may be set")
+        for name, value in (
+            ("deadband", deadband),
+            ("relative_deadband", relative_deadband),
+            ("min_interval", min_interval),
+        ):
+            if value is not None and value < 0:
+                raise ValueError(f"{name} must not be negative, got {value}")
+        self.deadband = deadband
+        self.relative_deadband = relative_deadband
+        self.min_interval = min_interval
+        self.delivered = 0
+        self.suppressed = 0
+        self._last: Dict[str, Tuple[Optional[str], Any]] = {}
+        self._last_time: Optional[float] = None
+        self._held: Dict[str, BrokerDatapoint] = {}
+
+    def accept(
+        self, fields: Mapping[str, BrokerDatapoint]
+    ) -> Optional[Mapping[str, BrokerDatapoint]]:
+        """Fields to deliver for a reply with the given fields, None if it is
+        not delivered now."""
+        now = time.monotonic()
+        if self.trailing_delay(now) is not None:
+            self.suppressed += 1
+            self._held.update(fields)
+            return None
+        if self._held:
+            self._held.update(fields)
+            fields, self._held = self._held, {}
+        return self._pass(fields, now)
+
+    def trailing_delay(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until min_interval has passed since the last delivery,
+        None if it already has."""
+        if self.min_interval is None or self._last_time is None:
+            return None
+        if now is None:
+            now = time.monotonic()
+        delay = self._last_time + self.min_interval - now
+        return delay if delay > 0 else None
+
+    def flush(self) -> Optional[Mapping[str, BrokerDatapoint]]:
+        """Held back fields to deliver once min_interval has passed, None if
+        there are none or they are within the deadband."""
+        fields, self._held = self._held, {}
+        if not fields:
+            return None
+        return self._pass(fields, time.monotonic())
+
+    def _pass(
+        self, fields: Mapping[str, BrokerDatapoint], now: float
+    ) -> Optional[Mapping[str, BrokerDatapoint]]:
+        values = {}
+        for path, datapoint in fields.items():
+            kind = datapoint.WhichOneof("value")
+            values[path] = (kind, getattr(datapoint, kind) if kind else None)
+        banded = self.deadband is not None or self.relative_deadband is not None
+        if banded and not any(self._significant(p, v) for p, v in values.items()):
+            self.suppressed += 1
+            return None
+
+        self._last.update(values)
+        self._last_time = now
+        self.delivered += 1
+        return fields
+
+    def _significant(self, path: str, value: Tuple[Optional[str], Any]) -> bool:
+        last = self._last.get(path)
+        if last is None or last[0] != value[0]:
+            return True
+        if value[0] not in _NUMERIC:
+            return last[1] != value[1]
+        change = abs(value[1] - last[1])
+        if self.deadband is not None:
+            return change > self.deadband
+        return change > self.relative_deadband * abs(last[1])
+
+    def stats(self) -> Dict[str, int]:
+        return {"delivered": self.delivered, "suppressed": self.suppressed}
+
@@ -0,0 +1,93 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Mapping, Optional
+
+import grpc
+
+from velocitas_sdk.proto.types_pb2 import Datapoint as BrokerDatapoint
+from velocitas_sdk.vdb.metrics import LATENCY_BUCKETS, Histogram
+
+
+class RateMeter:
+    """Counts events and their rate per second over the last window seconds,
+    or since creation while that is shorter."""
+
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self.count = 0
+        self._start = time.monotonic()
+        self._times: Deque[float] = deque()
+
+    def _expire(self, now: float):
+        times = self._times
+        while times and times[0] <= now - self.window:
+            times.popleft()
+
+    def mark(self):
+        now = time.monotonic()
+        self.count += 1
+        self._times.append(now)
+        self._expire(now)
+
+    @property
+    def rate(self) -> float:
+        now = time.monotonic()
+        self._expire(now)
+        elapsed = min(self.window, now - self._start)
+        return len(self._times) / elapsed if elapsed > 0 else 0.0
+
+
+def describe_error(ex: BaseException) -> str:
+    if isinstance(ex, grpc.aio.AioRpcError):  # type: ignore
+        return f"{ex.code().name}: {ex.details()}"
+    return repr(ex)
+
+
+def _summary(histogram: Histogram) -> Dict[str, float]:
+    return {
+        "count": histogram.count,
+        "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+        "p50": histogram.quantile(0.5),
+        "p99": histogram.quantile(0.99),
+    }
+
+
+class SubscriptionHealth:
+    """Callback side metrics of one subscription: lag from the newest broker
+    timestamp of a reply to the start of its callback, callback duration and
+    the last error raised by the callback."""
+
+    def __init__(self):
+        self.lag = Histogram(LATENCY_BUCKETS)
+        self.callback_duration = Histogram(LATENCY_BUCKETS)
+        self.last_error: Optional[str] = None
+
+    def observe_lag(self, fields: Mapping[str, BrokerDatapoint]):
+        newest = 0.0
+        for datapoint in fields.values():
+            timestamp = datapoint.timestamp
+            newest = max(newest, timestamp.seconds + timestamp.nanos * 1e-9)
+        if newest:
+            self.lag.observe(max(time.time() - newest, 0.0))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lag_seconds": _summary(self.lag),
+            "callback_seconds": _summary(self.callback_duration),
+            "last_callback_error": self.last_error,
+        }
+
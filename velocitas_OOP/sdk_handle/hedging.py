@@ -0,0 +1,98 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgedReads:
+    """Sends a second request for an idempotent read when the first one has
+    not answered within the given percentile of recent latencies, and takes
+    whichever answers first successfully.
+
+    Until min_samples latencies were recorded, initial_delay is used.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        initial_delay: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._delay: Optional[float] = None
+
+    def delay(self) -> float:
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay
+        if self._delay is None:
+            latencies = sorted(self._latencies)
+            self._delay = latencies[int(self.percentile * (len(latencies) - 1))]
+        return self._delay
+
+    def record(self, latency: float):
+        self._latencies.append(latency)
+        self._delay = None
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Run request(), hedging it with a second request() if needed."""
+        self.requests += 1
+        start = time.monotonic()
+        primary = asyncio.ensure_future(request())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.delay())
+            if done:
+                result = primary.result()
+                self.record(time.monotonic() - start)
+                return result
+
+            self.hedged += 1
+            hedge = asyncio.ensure_future(request())
+            pending.add(hedge)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        self.record(time.monotonic() - start)
+                        return task.result()
+                    error = error or task.exception()
+            raise error  # type: ignore
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "delay": self.delay(),
+        }
@@ -0,0 +1,157 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from velocitas_sdk.proto import types_pb2
+from velocitas_sdk.proto.types_pb2 import Datapoint as BrokerDatapoint
+from velocitas_sdk.proto.types_pb2 import DataType, Metadata
+
+# Bindings generated from an older types.proto have no entry types and no
+# value restrictions; only the data type is checked then.
+_HAS_RESTRICTIONS = "entry_type" in Metadata.DESCRIPTOR.fields_by_name
+_WRITABLE_ENTRY_TYPES = tuple(
+    getattr(types_pb2, name)
+    for name in ("ENTRY_TYPE_UNSPECIFIED", "ENTRY_TYPE_ACTUATOR")
+    if hasattr(types_pb2, name)
+)
+
+# Datapoint field carrying the values of each broker data type.
+_FIELDS: Dict[int, str] = {
+    types_pb2.STRING: "string_value",
+    types_pb2.BOOL: "bool_value",
+    types_pb2.INT8: "int32_value",
+    types_pb2.INT16: "int32_value",
+    types_pb2.INT32: "int32_value",
+    types_pb2.INT64: "int64_value",
+    types_pb2.UINT8: "uint32_value",
+    types_pb2.UINT16: "uint32_value",
+    types_pb2.UINT32: "uint32_value",
+    types_pb2.UINT64: "uint64_value",
+    types_pb2.FLOAT: "float_value",
+    types_pb2.DOUBLE: "double_value",
+    types_pb2.STRING_ARRAY: "string_array",
+    types_pb2.BOOL_ARRAY: "bool_array",
+    types_pb2.INT8_ARRAY: "int32_array",
+    types_pb2.INT16_ARRAY: "int32_array",
+    types_pb2.INT32_ARRAY: "int32_array",
+    types_pb2.INT64_ARRAY: "int64_array",
+    types_pb2.UINT8_ARRAY: "uint32_array",
+    types_pb2.UINT16_ARRAY: "uint32_array",
+    types_pb2.UINT32_ARRAY: "uint32_array",
+    types_pb2.UINT64_ARRAY: "uint64_array",
+    types_pb2.FLOAT_ARRAY: "float_array",
+    types_pb2.DOUBLE_ARRAY: "double_array",
+}
+
+# Types narrower than the Datapoint field carrying them.
+_BOUNDS: Dict[int, Tuple[int, int]] = {
+    types_pb2.INT8: (-(2**7), 2**7 - 1),
+    types_pb2.INT16: (-(2**15), 2**15 - 1),
+    types_pb2.UINT8: (0, 2**8 - 1),
+    types_pb2.UINT16: (0, 2**16 - 1),
+    types_pb2.INT8_ARRAY: (-(2**7), 2**7 - 1),
+    types_pb2.INT16_ARRAY: (-(2**15), 2**15 - 1),
+    types_pb2.UINT8_ARRAY: (0, 2**8 - 1),
+    types_pb2.UINT16_ARRAY: (0, 2**16 - 1),
+}
+
+
+class MetadataCache:
+    """Broker metadata of data points, keyed by path.
+
+    Filled by one GetMetadata call in refresh(). validate() rejects writes the
+    broker would refuse: values of the wrong type, writes to sensors and
+    attributes, and values outside the min/max or allowed values. Paths
+    without metadata are left for the broker to check.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Metadata] = {}
+
+    async def refresh(self, client, names: Optional[Iterable[str]] = None):
+        """Fetch the metadata of the given paths, or of all paths known to
+        the broker for None, in a single call."""
+        names = [] if names is None else list(names)
+        response = await client.GetMetadata(names)
+        if not names:
+            self._entries.clear()
+        for metadata in response.list:
+            self._entries[metadata.name] = metadata
+
+    def get(self, path: str) -> Optional[Metadata]:
+        return self._entries.get(path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def validate(self, path: str, datapoint: BrokerDatapoint):
+        """Raise TypeError for wrong-typed values or read-only paths and
+        ValueError for values out of range."""
+        metadata = self._entries.get(path)
+        if metadata is None:
+            return
+
+        field = datapoint.WhichOneof("value")
+        expected = _FIELDS.get(metadata.data_type)
+        if expected is not None and field != expected:
+            raise TypeError(
+                f"{path} is of type {DataType.Name(metadata.data_type)},"
+                f" cannot set a {field}"
+            )
+        if field is None:
+            return
+        if field.endswith("_array"):
+            values: List = list(getattr(datapoint, field).values)
+        else:
+            values = [getattr(datapoint, field)]
+
+        low, high = _BOUNDS.get(metadata.data_type, (None, None))
+        if _HAS_RESTRICTIONS:
+            if metadata.entry_type not in _WRITABLE_ENTRY_TYPES:
+                raise TypeError(
+                    f"set target value for non-actuator {path} is not allowed!"
+                )
+            low = _restriction(metadata, "min", low, max)
+            high = _restriction(metadata, "max", high, min)
+            allowed_field = metadata.allowed.WhichOneof("values")
+            if allowed_field is not None:
+                allowed = getattr(metadata.allowed, allowed_field).values
+                for value in values:
+                    if value not in allowed:
+                        raise ValueError(
+                            f"{value!r} is not an allowed value of {path},"
+                            f" allowed are {list(allowed)}"
+                        )
+
+        for value in values:
+            if (low is not None and value < low) or (high is not None and value > high):
+                raise ValueError(f"{value!r} is out of range [{low}, {high}] of {path}")
+
+
+def _restriction(metadata: Metadata, name: str, bound, pick):
+    """Combine the type bound with the min or max restriction of the
+    metadata, pick selects the tighter one."""
+    if not metadata.HasField(name):
+        return bound
+    restriction = getattr(metadata, name)
+    typed_value = restriction.WhichOneof("typed_value")
+    if typed_value is None:
+        return bound
+    value = getattr(restriction, typed_value)
+    return value if bound is None else pick(bound, value)
+
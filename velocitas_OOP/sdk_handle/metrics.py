@@ -0,0 +1,294 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import bisect
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+import grpc
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class Histogram:
+    """Counts of observations per bucket upper bound, plus their sum."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # The last count is the +Inf bucket.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile; inf if it is
+        beyond the last bucket, 0 without observations."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+
+class _MethodMetrics:
+    def __init__(self, buckets: Sequence[float]):
+        self.latency = Histogram(buckets)
+        self.started = 0
+        self.in_flight = 0
+        self.sent_bytes = 0
+        self.received_bytes = 0
+        self.received_messages = 0
+        self.errors: Dict[str, int] = defaultdict(int)
+
+
+class RpcMetrics:
+    """Per-method metrics of the broker calls: latency of unary calls, bytes
+    sent and received, calls and streams in flight and errors by gRPC
+    status. to_prometheus() renders them in the Prometheus text format,
+    serve() exposes them on a local HTTP endpoint."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.methods: Dict[str, _MethodMetrics] = {}
+
+    def method(self, name: str) -> _MethodMetrics:
+        metrics = self.methods.get(name)
+        if metrics is None:
+            metrics = self.methods[name] = _MethodMetrics(self.buckets)
+        return metrics
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+
+        def header(name: str, kind: str, text: str):
+            lines.append(f"# HELP vdb_client_{name} {text}")
+            lines.append(f"# TYPE vdb_client_{name} {kind}")
+
+        methods = sorted(self.methods.items())
+        header("rpc_duration_seconds", "histogram", "Latency of unary broker calls.")
+        for method, metrics in methods:
+            histogram = metrics.latency
+            if not histogram.count:
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram.counts):
+                cumulative += count
+                lines.append(
+                    "vdb_client_rpc_duration_seconds_bucket"
+                    f'{{method="{method}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                "vdb_client_rpc_duration_seconds_bucket"
+                f'{{method="{method}",le="+Inf"}} {histogram.count}'
+            )
+            lines.append(
+                f'vdb_client_rpc_duration_seconds_sum{{method="{method}"}}'
+                f" {histogram.sum}"
+            )
+            lines.append(
+                f'vdb_client_rpc_duration_seconds_count{{method="{method}"}}'
+                f" {histogram.count}"
+            )
+
+        for name, kind, text, attribute in (
+            ("rpc_started_total", "counter", "Broker calls started.", "started"),
+            ("rpc_in_flight", "gauge", "Broker calls in flight.", "in_flight"),
+            ("rpc_sent_bytes_total", "counter", "Request bytes.", "sent_bytes"),
+            (
+                "rpc_received_bytes_total",
+                "counter",
+                "Response bytes.",
+                "received_bytes",
+            ),
+            (
+                "rpc_received_messages_total",
+                "counter",
+                "Response messages.",
+                "received_messages",
+            ),
+        ):
+            header(name, kind, text)
+            for method, metrics in methods:
+                lines.append(
+                    f'vdb_client_{name}{{method="{method}"}}'
+                    f" {getattr(metrics, attribute)}"
+                )
+
+        header("rpc_errors_total", "counter", "Failed broker calls by gRPC status.")
+        for method, metrics in methods:
+            for code, count in sorted(metrics.errors.items()):
+                lines.append(
+                    f'vdb_client_rpc_errors_total{{method="{method}",code="{code}"}}'
+                    f" {count}"
+                )
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, port: int = 9464, host: str = "127.0.0.1"):
+        """Serve to_prometheus() at http://host:port/metrics until the
+        returned server is closed."""
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                request = await reader.readline()
+                while (await reader.readline()).strip():
+                    pass
+                parts = request.split()
+                if len(parts) > 1 and parts[1] == b"/metrics":
+                    status = "200 OK"
+                    body = self.to_prometheus().encode()
+                else:
+                    status = "404 Not Found"
+                    body = b""
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: text/plain; version=0.0.4\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+            except Exception:
+                logger.exception("Error occured in RpcMetrics.serve")
+            finally:
+                writer.close()
+
+        return await asyncio.start_server(handle, host, port)
+
+
+def _method_name(method) -> str:
+    if isinstance(method, bytes):
+        method = method.decode()
+    return method.rsplit("/", 1)[-1]
+
+
+def metrics_interceptors(metrics: RpcMetrics) -> list:
+    """Channel interceptors recording the unary calls and streams of the
+    channel in metrics. A gRPC channel accepts each interceptor for one kind
+    of call only, hence one per kind."""
+    return [
+        UnaryMetricsInterceptor(metrics),
+        StreamMetricsInterceptor(metrics),
+        BidiStreamMetricsInterceptor(metrics),
+    ]
+
+
+def _track_stream(metrics: _MethodMetrics, call):
+    """Count call as in flight until done and its responses as received."""
+    metrics.in_flight += 1
+
+    def finished(_):
+        metrics.in_flight -= 1
+
+    call.add_done_callback(finished)
+
+    async def responses():
+        try:
+            async for response in call:
+                metrics.received_bytes += response.ByteSize()
+                metrics.received_messages += 1
+                yield response
+        except grpc.aio.AioRpcError as ex:  # type: ignore
+            metrics.errors[ex.code().name] += 1
+            raise
+
+    return responses()
+
+
+class UnaryMetricsInterceptor(grpc.aio.UnaryUnaryClientInterceptor):  # type: ignore
+    def __init__(self, metrics: RpcMetrics):
+        self.metrics = metrics
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        metrics = self.metrics.method(_method_name(client_call_details.method))
+        metrics.started += 1
+        metrics.in_flight += 1
+        metrics.sent_bytes += request.ByteSize()
+        start = time.perf_counter()
+        try:
+            call = await continuation(client_call_details, request)
+            response = await call
+        except grpc.aio.AioRpcError as ex:  # type: ignore
+            metrics.errors[ex.code().name] += 1
+            raise
+        except asyncio.CancelledError:
+            metrics.errors[grpc.StatusCode.CANCELLED.name] += 1
+            raise
+        finally:
+            metrics.in_flight -= 1
+            metrics.latency.observe(time.perf_counter() - start)
+        metrics.received_bytes += response.ByteSize()
+        metrics.received_messages += 1
+        return response
+
+
+class StreamMetricsInterceptor(grpc.aio.UnaryStreamClientInterceptor):  # type: ignore
+    def __init__(self, metrics: RpcMetrics):
+        self.metrics = metrics
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        metrics = self.metrics.method(_method_name(client_call_details.method))
+        metrics.started += 1
+        metrics.sent_bytes += request.ByteSize()
+        call = await continuation(client_call_details, request)
+        return _track_stream(metrics, call)
+
+
+class BidiStreamMetricsInterceptor(
+    grpc.aio.StreamStreamClientInterceptor  # type: ignore
+):
+    def __init__(self, metrics: RpcMetrics):
+        self.metrics = metrics
+
+    async def intercept_stream_stream(
+        self, continuation, client_call_details, request_iterator
+    ):
+        metrics = self.metrics.method(_method_name(client_call_details.method))
+        metrics.started += 1
+
+        # Requests given with call.write() arrive through this iterator too.
+        async def requests():
+            async for request in request_iterator:
+                metrics.sent_bytes += request.ByteSize()
+                yield request
+
+        call = await continuation(client_call_details, requests())
+        return _track_stream(metrics, call)
+
@@ -13,9 +13,24 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import asyncio
-import contextvars
 import logging
-from typing import Generic, List, Type, TypeVar, overload
+import sys
+from concurrent.futures import Executor
+from types import ModuleType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    overload,
+)
 from urllib.parse import urlparse
 
 import grpc
@@ -23,6 +38,30 @@ from deprecated import deprecated
 
 from velocitas_sdk import config
 from velocitas_sdk.proto.types_pb2 import (
+    BOOL,
+    BOOL_ARRAY,
+    DOUBLE,
+    DOUBLE_ARRAY,
+    FLOAT,
+    FLOAT_ARRAY,
+    INT16,
+    INT16_ARRAY,
+    INT32,
+    INT32_ARRAY,
+    INT64,
+    INT64_ARRAY,
+    INT8,
+    INT8_ARRAY,
+    STRING,
+    STRING_ARRAY,
+    UINT16,
+    UINT16_ARRAY,
+    UINT32,
+    UINT32_ARRAY,
+    UINT64,
+    UINT64_ARRAY,
+    UINT8,
+    UINT8_ARRAY,
     BoolArray,
     DoubleArray,
     FloatArray,
@@ -34,29 +73,74 @@ from velocitas_sdk.proto.types_pb2 import (
 )
 from velocitas_sdk.proto.types_pb2 import Datapoint as BrokerDatapoint
 from velocitas_sdk.vdb.client import VehicleDataBrokerClient
+from velocitas_sdk.vdb.dispatch import DispatchQueue
+from velocitas_sdk.vdb.filters import DeliveryFilter
 from velocitas_sdk.vdb.subscriptions import SubscriptionManager, VdbSubscription
 from velocitas_sdk.vdb.types import TypedDataPointResult
 
 logger = logging.getLogger(__name__)
 
-context = contextvars.ContextVar("context", default=[])  # type: ignore
-
 
 class Node:
     """Node in the tree structure."""
 
-    def get_path(self):
-        path = [self.name]
-        node = self.parent
-        while node:
-            path.insert(0, node.name)
-            node = node.parent
+    # Subclasses without __slots__ (branches) get a __dict__ for their
+    # child attributes, data points (leaves) stay compact.
+    __slots__ = ("_name", "_parent", "_path_cache")
 
-        return ".".join(path)
+    # Bumped whenever a node with an already computed path is renamed or
+    # re-parented; every cached path from an older generation is stale.
+    _path_generation = 0
 
     def __init__(self, parent=None):
-        self.name = type(self).__name__
-        self.parent = parent
+        self._path_cache = None
+        self._name = type(self).__name__
+        self._parent = parent
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, name: str):
+        self._name = name
+        self._invalidate_path()
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent):
+        self._parent = parent
+        self._invalidate_path()
+
+    def _invalidate_path(self):
+        if self._path_cache is not None:
+            Node._path_generation += 1
+            self._path_cache = None
+
+    def get_path(self) -> str:
+        """Return the dotted path of the node, computed once and interned."""
+        cached = self._path_cache
+        if cached is not None and cached[0] == Node._path_generation:
+            return cached[1]
+
+        if self._parent is None:
+            path = sys.intern(self._name)
+        else:
+            path = sys.intern(self._parent.get_path() + "." + self._name)
+        self._path_cache = (Node._path_generation, path)
+        return path
+
+    def _child_nodes(self) -> Iterator["Node"]:
+        for cls in type(self).__mro__:
+            for attr, value in vars(cls).items():
+                if isinstance(value, LazyNode) and attr not in vars(self):
+                    getattr(self, attr)
+        for value in vars(self).values():
+            if isinstance(value, Node) and value.parent is self:
+                yield value
 
     def get_client(self):
         return VehicleDataBrokerClient()
@@ -65,57 +149,107 @@ class Node:
         tasks = list(SubscriptionManager._subscription_tasks.values())
         await asyncio.gather(*tasks)
 
-    def get_context(self) -> List[str]:
-        return context.get()
 
-    def set_context(self, ctx: List[str]):
-        context.set(ctx)
+TNode = TypeVar("TNode", bound=Node)
 
 
-class DataPoint(Node):
-    """Base class for data points. Do not use for modelling directly."""
+class LazyNode(Generic[TNode]):
+    """Declares a child node which is created on first attribute access.
+    The created node replaces the declaration on the instance, so later
+    accesses are plain attribute lookups:
 
-    def __init__(self, name: str, parent: Node):
-        super().__init__(parent)
+    class Vehicle(Model):
+        Speed = LazyNode(DataPointFloat)
+        Cabin = LazyNode(Cabin)
+
+    node_type is called with the node name and the parent, like the
+    constructors of DataPoint and generated Model branches. Note that inside
+    the class body a declaration shadows a class of the same name for the
+    following lines.
+    """
+
+    def __init__(
+        self, node_type: Callable[[str, Node], TNode], name: Optional[str] = None
+    ):
+        self.node_type = node_type
         self.name = name
+        self.attr = name
 
-    def join(self, *args):
-        if not self.get_context():
-            self.set_context([self.get_path()])
+    def __set_name__(self, owner, attr: str):
+        self.attr = attr
+        if self.name is None:
+            self.name = attr
 
-        for arg in args:
-            self.get_context().append("JOIN")
-            self.get_context().append(arg.get_path())
+    @overload
+    def __get__(self, instance: None, owner) -> "LazyNode[TNode]": ...
 
-        return self
+    @overload
+    def __get__(self, instance: Node, owner) -> TNode: ...
 
-    def where(self, condition: str):
-        if not self.get_context():
-            self.set_context([self.get_path()])
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        node = self.node_type(self.name, instance)  # type: ignore
+        instance.__dict__[self.attr] = node
+        return node
 
-        self.get_context().append("WHERE")
-        self.get_context().append(condition)
-        return self
 
-    def get_query(self) -> str:
-        if not self.get_context():
-            self.set_context([self.get_path()])
+class DataPoint(Node):
+    """Base class for data points. Do not use for modelling directly."""
 
-        ctx = self.get_context()
-        query = "SELECT " + " ".join(ctx).replace(" JOIN", ",")
-        self.set_context([])
-        return query
+    __slots__ = ()
 
-    async def subscribe(self, on_update):
-        query = self.get_query()
-        sub = VdbSubscription(self.get_client(), query, on_update)
-        SubscriptionManager._add_subscription(sub)
-        return sub
+    def __init__(self, name: str, parent: Node):
+        self._path_cache = None
+        self._name = name
+        self._parent = parent
+
+    def _child_nodes(self) -> Iterator[Node]:
+        return iter(())
+
+    def query(self) -> "Query":
+        """Return the query selecting this data point."""
+        return Query(self, (self.get_path(),))
+
+    def join(self, *args: "DataPoint") -> "Query":
+        return self.query().join(*args)
+
+    def where(self, condition: str) -> "Query":
+        return self.query().where(condition)
+
+    def get_query(self) -> str:
+        return self.query().get_query()
+
+    async def subscribe(
+        self,
+        on_update,
+        queue: Optional[DispatchQueue] = None,
+        executor: Optional[Executor] = None,
+        deadband: Optional[float] = None,
+        relative_deadband: Optional[float] = None,
+        min_interval: Optional[float] = None,
+    ):
+        """Subscribe to updates of the data point.
+
+        Updates can be limited to those moving the value by more than
+        deadband, or by more than relative_deadband times the value last
+        delivered, and to at most one per min_interval seconds; the latest
+        value held back by min_interval is delivered once it has passed.
+        """
+        return await self.query().subscribe(
+            on_update, queue, executor, deadband, relative_deadband, min_interval
+        )
 
     async def get(self):
         try:
             path = self.get_path()
-            response = await self.get_client().GetDatapoints([path])
+            client = self.get_client()
+            cache = client.value_cache
+            if cache is not None:
+                datapoint = cache.get(path)
+                if datapoint is not None:
+                    return datapoint
+            response = await client.GetDatapoints([path])
             return response.datapoints[path]
         except (grpc.aio.AioRpcError, Exception):  # type: ignore
             logger.error("Error occured in DataPoint.get")
@@ -133,12 +267,14 @@ class DataPoint(Node):
 
     async def _set(self, value, subclass_name: str):
         """Wrapper setter for the public set(value) with specific Datapoint type."""
+        datapoint = self.create_broker_data_point(value)
+        path = self.get_path()
+        client = self.get_client()
+        if client.metadata_cache is not None:
+            # Refused locally, without a round trip to the broker.
+            client.metadata_cache.validate(path, datapoint)
         try:
-            datapoint = self.create_broker_data_point(value)
-            path = self.get_path()
-            response = await self.get_client().SetDatapoints(
-                datapoints={path: datapoint}
-            )
+            response = await client.SetDatapoints(datapoints={path: datapoint})
             if response.errors:
                 raise TypeError(
                     f"set target value for non-actuator {path} is not allowed!"
@@ -149,6 +285,18 @@ class DataPoint(Node):
             logger.exception(ex)
             raise
 
+    def suppress_unchanged(self, epsilon: float = 0.0):
+        """Skip set() calls whose value equals the last value written or
+        observed for this data point; float types may differ by epsilon."""
+        self.get_client().enable_change_suppression().watch(self.get_path(), epsilon)
+        return self
+
+    def write_priority(self, priority: int):
+        """Send set() calls of this data point in the given lane of
+        velocitas_sdk.vdb.ratelimit (CRITICAL, NORMAL or BULK)."""
+        self.get_client().set_write_priority(self.get_path(), priority)
+        return self
+
     def create_broker_data_point(self, value):
         """Override the data point creator for the target datapoint type.
         - An error will be raised if the target value can NOT be set successfully.
@@ -156,520 +304,401 @@ class DataPoint(Node):
         raise Exception(f"Unsupported datpoint type for setting the value = {value}")
 
 
-class DataPointBoolean(DataPoint):
-    """A data point with a value of type bool."""
+class Query:
+    """Immutable broker query of selected paths and WHERE conditions.
+    join() and where() return new queries, so queries can be shared and built
+    from concurrent tasks. The query string is compiled once; queries compare
+    and hash by it:
 
-    async def get(self) -> TypedDataPointResult[bool]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[bool](
-                self.get_path(), response.bool_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointBoolean.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: bool):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: bool):
-        return BrokerDatapoint(bool_value=value)
+    await model.Speed.join(model.Cabin.Door.Row1.Left.IsOpen).where(
+        "Vehicle.Speed > 50"
+    ).subscribe(on_update)
+    """
 
+    __slots__ = ("_node", "_paths", "_conditions", "_compiled")
 
-class DataPointBooleanArray(DataPoint):
-    """A data point array with a value of type boolean."""
+    def __init__(self, node: Node, paths: Tuple[str, ...], conditions=()):
+        self._node = node
+        self._paths = tuple(dict.fromkeys(paths))
+        self._conditions = tuple(conditions)
+        compiled = "SELECT " + ", ".join(self._paths)
+        if self._conditions:
+            compiled += " WHERE " + " AND ".join(self._conditions)
+        self._compiled = sys.intern(compiled)
 
-    async def get(self) -> TypedDataPointResult[List[bool]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[bool]](
-                self.get_path(), list(response.bool_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointBooleanArray.get")
-            logger.exception(ex)
-            raise
+    @property
+    def paths(self) -> Tuple[str, ...]:
+        return self._paths
 
-    async def set(self, value: List[bool]):
-        await self._set(value, self.__class__.__name__)
+    @property
+    def conditions(self) -> Tuple[str, ...]:
+        return self._conditions
 
-    def create_broker_data_point(self, value: List[bool]):
-        array = BoolArray(values=value)
-        return BrokerDatapoint(bool_array=array)
+    def join(self, *args: DataPoint) -> "Query":
+        paths = self._paths + tuple(arg.get_path() for arg in args)
+        return Query(self._node, paths, self._conditions)
 
+    def where(self, condition: str) -> "Query":
+        return Query(self._node, self._paths, self._conditions + (condition,))
 
-class DataPointInt8(DataPoint):
-    """A data point with a value of type int32."""
+    def get_query(self) -> str:
+        return self._compiled
+
+    async def subscribe(
+        self,
+        on_update,
+        queue: Optional[DispatchQueue] = None,
+        executor: Optional[Executor] = None,
+        deadband: Optional[float] = None,
+        relative_deadband: Optional[float] = None,
+        min_interval: Optional[float] = None,
+    ) -> VdbSubscription:
+        delivery_filter = None
+        if (deadband, relative_deadband, min_interval) != (None, None, None):
+            delivery_filter = DeliveryFilter(deadband, relative_deadband, min_interval)
+        sub = VdbSubscription(
+            self._node.get_client(),
+            self._compiled,
+            on_update,
+            queue,
+            executor,
+            delivery_filter,
+            self._conditions,
+        )
+        SubscriptionManager._add_subscription(sub)
+        return sub
 
-    async def get(self) -> TypedDataPointResult[int]:
+    def __str__(self) -> str:
+        return self._compiled
+
+    def __repr__(self) -> str:
+        return f"Query({self._compiled!r})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Query):
+            return NotImplemented
+        return self._compiled == other._compiled
+
+    def __hash__(self) -> int:
+        return hash(self._compiled)
+
+
+class _DataPointType(NamedTuple):
+    """Describes how a typed data point maps onto the broker Datapoint."""
+
+    # Name of the Datapoint oneof field holding the value.
+    field: str
+    # Wrapper message of array values, None for scalar types.
+    array_type: Optional[Type[Any]]
+    # Python type of a scalar value or of the array elements.
+    python_type: type
+    # Broker DataType of the data point.
+    data_type: int
+
+    def decode(self, datapoint: BrokerDatapoint):
+        if self.array_type is None:
+            return getattr(datapoint, self.field)
+        if _ndarray is not None:
+            return _ndarray.to_ndarray(getattr(datapoint, self.field), self.field)
+        # Slicing copies the repeated field into a list faster than list().
+        return getattr(datapoint, self.field).values[:]
+
+    def encode(self, value) -> BrokerDatapoint:
+        if self.array_type is None:
+            return BrokerDatapoint(**{self.field: value})
+        if hasattr(value, "__array_interface__"):
+            # A NumPy array, converted without Python objects per element.
+            from velocitas_sdk.vdb import ndarray
+
+            array = ndarray.from_ndarray(self.array_type, self.field, value)
+            return BrokerDatapoint(**{self.field: array})
+        return BrokerDatapoint(**{self.field: self.array_type(values=value)})
+
+
+# The velocitas_sdk.vdb.ndarray module while NumPy arrays are enabled.
+_ndarray: Optional[ModuleType] = None
+
+
+def use_numpy_arrays(enabled: bool = True):
+    """Return the values of numeric array data points as NumPy arrays instead
+    of lists, from get(), Model.get_many() and DataPointReply.get(). Float and
+    double arrays are read-only views, see velocitas_sdk.vdb.ndarray.
+    set() accepts NumPy arrays either way."""
+    global _ndarray
+    if not enabled:
+        _ndarray = None
+        return
+    from velocitas_sdk.vdb import ndarray
+
+    ndarray.require_numpy()
+    _ndarray = ndarray
+
+
+async def get_datapoints(
+    client: VehicleDataBrokerClient, datapoints: Tuple["TypedDataPoint", ...]
+) -> List[TypedDataPointResult]:
+    """Read the given data points with one GetDatapoints call of the client,
+    results in the order of the data points."""
+    if not datapoints:
+        return []
+    paths = list(dict.fromkeys(node.get_path() for node in datapoints))
+    response = await client.GetDatapoints(paths)
+    return [
+        node._to_result(response.datapoints[node.get_path()]) for node in datapoints
+    ]
+
+
+_DATAPOINT_TYPES: Dict[str, _DataPointType] = {
+    "DataPointBoolean": _DataPointType("bool_value", None, bool, BOOL),
+    "DataPointBooleanArray": _DataPointType("bool_array", BoolArray, bool, BOOL_ARRAY),
+    "DataPointInt8": _DataPointType("int32_value", None, int, INT8),
+    "DataPointInt8Array": _DataPointType("int32_array", Int32Array, int, INT8_ARRAY),
+    "DataPointInt16": _DataPointType("int32_value", None, int, INT16),
+    "DataPointInt16Array": _DataPointType("int32_array", Int32Array, int, INT16_ARRAY),
+    "DataPointInt32": _DataPointType("int32_value", None, int, INT32),
+    "DataPointInt32Array": _DataPointType("int32_array", Int32Array, int, INT32_ARRAY),
+    "DataPointInt64": _DataPointType("int64_value", None, int, INT64),
+    "DataPointInt64Array": _DataPointType("int64_array", Int64Array, int, INT64_ARRAY),
+    "DataPointUint8": _DataPointType("uint32_value", None, int, UINT8),
+    "DataPointUint8Array": _DataPointType(
+        "uint32_array", Uint32Array, int, UINT8_ARRAY
+    ),
+    "DataPointUint16": _DataPointType("uint32_value", None, int, UINT16),
+    "DataPointUint16Array": _DataPointType(
+        "uint32_array", Uint32Array, int, UINT16_ARRAY
+    ),
+    "DataPointUint32": _DataPointType("uint32_value", None, int, UINT32),
+    "DataPointUint32Array": _DataPointType(
+        "uint32_array", Uint32Array, int, UINT32_ARRAY
+    ),
+    "DataPointUint64": _DataPointType("uint64_value", None, int, UINT64),
+    "DataPointUint64Array": _DataPointType(
+        "uint64_array", Uint64Array, int, UINT64_ARRAY
+    ),
+    "DataPointFloat": _DataPointType("float_value", None, float, FLOAT),
+    "DataPointFloatArray": _DataPointType(
+        "float_array", FloatArray, float, FLOAT_ARRAY
+    ),
+    "DataPointDouble": _DataPointType("double_value", None, float, DOUBLE),
+    "DataPointDoubleArray": _DataPointType(
+        "double_array", DoubleArray, float, DOUBLE_ARRAY
+    ),
+    "DataPointString": _DataPointType("string_value", None, str, STRING),
+    "DataPointStringArray": _DataPointType(
+        "string_array", StringArray, str, STRING_ARRAY
+    ),
+}
+
+T = TypeVar("T")
+
+
+class TypedDataPoint(DataPoint, Generic[T]):
+    """Data point whose value type is described by its _DataPointType.
+    Use one of the DataPoint* classes below for modelling."""
+
+    __slots__ = ()
+
+    _type: _DataPointType
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not isinstance(getattr(cls, "_type", None), _DataPointType):
+            raise TypeError(f"Datapoint type {cls.__name__} has no _DataPointType")
+
+    async def get(self) -> TypedDataPointResult[T]:
         try:
             response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[int](
-                self.get_path(), response.int32_value, response.timestamp
-            )
+            return self._to_result(response)
         except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointInt8.get")
+            logger.error("Error occured in %s.get", self.__class__.__name__)
             logger.exception(ex)
             raise
 
-    async def set(self, value: int):
+    async def set(self, value: T):
         await self._set(value, self.__class__.__name__)
 
-    def create_broker_data_point(self, value: int):
-        return BrokerDatapoint(int32_value=value)
+    @property
+    def data_type(self) -> int:
+        """Broker DataType of this data point."""
+        return self._type.data_type
 
+    def create_broker_data_point(self, value: T):
+        return self._type.encode(value)
 
-class DataPointInt8Array(DataPoint):
-    """A data point array with a value of type int32."""
-
-    async def get(self) -> TypedDataPointResult[List[int]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[int]](
-                self.get_path(), list(response.int32_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointInt8Array.get")
-            logger.exception(ex)
-            raise
+    def _to_result(self, datapoint: BrokerDatapoint) -> TypedDataPointResult[T]:
+        # Plain constructor call: subscripting the generic costs more than
+        # decoding the value.
+        return TypedDataPointResult(
+            self.get_path(), self._type.decode(datapoint), datapoint.timestamp
+        )
 
-    async def set(self, value: List[int]):
-        await self._set(value, self.__class__.__name__)
 
-    def create_broker_data_point(self, value: List[int]):
-        array = Int32Array(values=value)
-        return BrokerDatapoint(int32_array=array)
+class DataPointBoolean(TypedDataPoint[bool]):
+    """A data point with a value of type bool."""
 
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointBoolean"]
 
-class DataPointInt16(DataPoint):
-    """A data point with a value of type int32."""
 
-    async def get(self) -> TypedDataPointResult[int]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[int](
-                self.get_path(), response.int32_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointInt16.get")
-            logger.exception(ex)
-            raise
+class DataPointBooleanArray(TypedDataPoint[List[bool]]):
+    """A data point array with a value of type boolean."""
 
-    async def set(self, value: int):
-        await self._set(value, self.__class__.__name__)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointBooleanArray"]
 
-    def create_broker_data_point(self, value: int):
-        return BrokerDatapoint(int32_value=value)
 
+class DataPointInt8(TypedDataPoint[int]):
+    """A data point with a value of type int32."""
 
-class DataPointInt16Array(DataPoint):
-    """A data point array with a value of type int32."""
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointInt8"]
 
-    async def get(self) -> TypedDataPointResult[List[int]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[int]](
-                self.get_path(), list(response.int32_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointInt16Array.get")
-            logger.exception(ex)
-            raise
 
-    async def set(self, value: List[int]):
-        await self._set(value, self.__class__.__name__)
+class DataPointInt8Array(TypedDataPoint[List[int]]):
+    """A data point array with a value of type int32."""
 
-    def create_broker_data_point(self, value: List[int]):
-        array = Int32Array(values=value)
-        return BrokerDatapoint(int32_array=array)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointInt8Array"]
 
 
-class DataPointInt32(DataPoint):
+class DataPointInt16(TypedDataPoint[int]):
     """A data point with a value of type int32."""
 
-    async def get(self) -> TypedDataPointResult[int]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[int](
-                self.get_path(), response.int32_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointInt32.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: int):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: int):
-        return BrokerDatapoint(int32_value=value)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointInt16"]
 
 
-class DataPointInt32Array(DataPoint):
+class DataPointInt16Array(TypedDataPoint[List[int]]):
     """A data point array with a value of type int32."""
 
-    async def get(self) -> TypedDataPointResult[List[int]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[int]](
-                self.get_path(), list(response.int32_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointInt32Array.get")
-            logger.exception(ex)
-            raise
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointInt16Array"]
 
-    async def set(self, value: List[int]):
-        await self._set(value, self.__class__.__name__)
 
-    def create_broker_data_point(self, value: List[int]):
-        array = Int32Array(values=value)
-        return BrokerDatapoint(int32_array=array)
+class DataPointInt32(TypedDataPoint[int]):
+    """A data point with a value of type int32."""
 
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointInt32"]
 
-class DataPointInt64(DataPoint):
-    """A data point with a value of type int64."""
 
-    async def get(self) -> TypedDataPointResult[int]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[int](
-                self.get_path(), response.int64_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointInt64.get")
-            logger.exception(ex)
-            raise
+class DataPointInt32Array(TypedDataPoint[List[int]]):
+    """A data point array with a value of type int32."""
 
-    async def set(self, value: int):
-        await self._set(value, self.__class__.__name__)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointInt32Array"]
 
-    def create_broker_data_point(self, value: int):
-        return BrokerDatapoint(int64_value=value)
 
+class DataPointInt64(TypedDataPoint[int]):
+    """A data point with a value of type int64."""
 
-class DataPointInt64Array(DataPoint):
-    """A data point array with a value of type int64."""
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointInt64"]
 
-    async def get(self) -> TypedDataPointResult[List[int]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[int]](
-                self.get_path(), list(response.int64_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointInt64Array.get")
-            logger.exception(ex)
-            raise
 
-    async def set(self, value: List[int]):
-        await self._set(value, self.__class__.__name__)
+class DataPointInt64Array(TypedDataPoint[List[int]]):
+    """A data point array with a value of type int64."""
 
-    def create_broker_data_point(self, value: List[int]):
-        array = Int64Array(values=value)
-        return BrokerDatapoint(int64_array=array)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointInt64Array"]
 
 
-class DataPointUint8(DataPoint):
+class DataPointUint8(TypedDataPoint[int]):
     """A data point with a value of type uint32."""
 
-    async def get(self) -> TypedDataPointResult[int]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[int](
-                self.get_path(), response.uint32_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointUInt8.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: int):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: int):
-        return BrokerDatapoint(uint32_value=value)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointUint8"]
 
 
-class DataPointUint8Array(DataPoint):
+class DataPointUint8Array(TypedDataPoint[List[int]]):
     """A data point array with a value of type unsigned uint32."""
 
-    async def get(self) -> TypedDataPointResult[List[int]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[int]](
-                self.get_path(), list(response.uint32_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointUint8Array.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: List[int]):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: List[int]):
-        array = Uint32Array(values=value)
-        return BrokerDatapoint(uint32_array=array)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointUint8Array"]
 
 
-class DataPointUint16(DataPoint):
+class DataPointUint16(TypedDataPoint[int]):
     """A data point with a value of type uint32."""
 
-    async def get(self) -> TypedDataPointResult[int]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[int](
-                self.get_path(), response.uint32_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointUInt16.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: int):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: int):
-        return BrokerDatapoint(uint32_value=value)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointUint16"]
 
 
-class DataPointUint16Array(DataPoint):
+class DataPointUint16Array(TypedDataPoint[List[int]]):
     """A data point array with a value of type unsigned uint32."""
 
-    async def get(self) -> TypedDataPointResult[List[int]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[int]](
-                self.get_path(), list(response.uint32_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointUint16Array.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: List[int]):
-        await self._set(value, self.__class__.__name__)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointUint16Array"]
 
-    def create_broker_data_point(self, value: List[int]):
-        array = Uint32Array(values=value)
-        return BrokerDatapoint(uint32_array=array)
 
-
-class DataPointUint32(DataPoint):
+class DataPointUint32(TypedDataPoint[int]):
     """A data point with a value of type uint32."""
 
-    async def get(self) -> TypedDataPointResult[int]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[int](
-                self.get_path(), response.uint32_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointUInt32.get")
-            logger.exception(ex)
-            raise
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointUint32"]
 
-    async def set(self, value: int):
-        await self._set(value, self.__class__.__name__)
 
-    def create_broker_data_point(self, value: int):
-        return BrokerDatapoint(uint32_value=value)
-
-
-class DataPointUint32Array(DataPoint):
+class DataPointUint32Array(TypedDataPoint[List[int]]):
     """A data point array with a value of type unsigned uint32."""
 
-    async def get(self) -> TypedDataPointResult[List[int]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[int]](
-                self.get_path(), list(response.uint32_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointUint32Array.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: List[int]):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: List[int]):
-        array = Uint32Array(values=value)
-        return BrokerDatapoint(uint32_array=array)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointUint32Array"]
 
 
-class DataPointUint64(DataPoint):
+class DataPointUint64(TypedDataPoint[int]):
     """A data point with a value of type unit64."""
 
-    async def get(self) -> TypedDataPointResult[int]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[int](
-                self.get_path(), response.uint64_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointUInt64.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: int):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: int):
-        return BrokerDatapoint(uint64_value=value)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointUint64"]
 
 
-class DataPointUint64Array(DataPoint):
+class DataPointUint64Array(TypedDataPoint[List[int]]):
     """A data point array with a value of type unsigned uint64."""
 
-    async def get(self) -> TypedDataPointResult[List[int]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[int]](
-                self.get_path(), list(response.uint64_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointUint64Array.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: List[int]):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: List[int]):
-        array = Uint64Array(values=value)
-        return BrokerDatapoint(uint64_array=array)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointUint64Array"]
 
 
-class DataPointFloat(DataPoint):
+class DataPointFloat(TypedDataPoint[float]):
     """A data point with a value of type float."""
 
-    async def get(self) -> TypedDataPointResult[float]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[float](
-                self.get_path(), response.float_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointFloat.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: float):
-        await self._set(value, self.__class__.__name__)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointFloat"]
 
-    def create_broker_data_point(self, value: float):
-        return BrokerDatapoint(float_value=value)
 
-
-class DataPointFloatArray(DataPoint):
+class DataPointFloatArray(TypedDataPoint[List[float]]):
     """A data point array with a value of type float."""
 
-    async def get(self) -> TypedDataPointResult[List[float]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[float]](
-                self.get_path(), list(response.float_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointFloatArray.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: List[float]):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: List[float]):
-        array = FloatArray(values=value)
-        return BrokerDatapoint(float_array=array)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointFloatArray"]
 
 
-class DataPointDouble(DataPoint):
+class DataPointDouble(TypedDataPoint[float]):
     """A data point with a value of type double."""
 
-    async def get(self) -> TypedDataPointResult[float]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[float](
-                self.get_path(), response.double_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointDouble.get")
-            logger.exception(ex)
-            raise
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointDouble"]
 
-    async def set(self, value: float):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: float):
-        return BrokerDatapoint(double_value=value)
 
-
-class DataPointDoubleArray(DataPoint):
+class DataPointDoubleArray(TypedDataPoint[List[float]]):
     """A data point array with a value of type double."""
 
-    async def get(self) -> TypedDataPointResult[List[float]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[float]](
-                self.get_path(), list(response.double_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointDoubleArray.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: List[float]):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: List[float]):
-        array = DoubleArray(values=value)
-        return BrokerDatapoint(double_array=array)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointDoubleArray"]
 
 
-class DataPointString(DataPoint):
+class DataPointString(TypedDataPoint[str]):
     """A data point with a value of type string."""
 
-    async def get(self) -> TypedDataPointResult[str]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[str](
-                self.get_path(), response.string_value, response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointString.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: str):
-        await self._set(value, self.__class__.__name__)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointString"]
 
-    def create_broker_data_point(self, value: str):
-        return BrokerDatapoint(string_value=value)
 
-
-class DataPointStringArray(DataPoint):
+class DataPointStringArray(TypedDataPoint[List[str]]):
     """A data point array with a value of type String."""
 
-    async def get(self) -> TypedDataPointResult[List[str]]:
-        try:
-            response: BrokerDatapoint = await super().get()
-            return TypedDataPointResult[List[str]](
-                self.get_path(), list(response.string_array.values), response.timestamp
-            )
-        except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
-            logger.error("Error occured in DataPointStringArray.get")
-            logger.exception(ex)
-            raise
-
-    async def set(self, value: List[str]):
-        await self._set(value, self.__class__.__name__)
-
-    def create_broker_data_point(self, value: List[str]):
-        array = StringArray(values=value)
-        return BrokerDatapoint(string_array=array)
+    __slots__ = ()
+    _type = _DATAPOINT_TYPES["DataPointStringArray"]
 
 
 class BatchSetBuilder:
@@ -779,6 +808,8 @@ class BatchSetBuilder:
     def add(self, node: DataPoint, value) -> "BatchSetBuilder":
         node_name = node.get_path()
         node_value = node.create_broker_data_point(value)
+        if self.__client.metadata_cache is not None:
+            self.__client.metadata_cache.validate(node_name, node_value)
         if node_name in self.__nodes:
             logger.error(
                 "Key '%s' already present in set-batch!"
@@ -807,30 +838,154 @@ class BatchSetBuilder:
             raise
 
 
+class _TrieEntry:
+    """One path segment of a _NodeIndex trie. The children of an entry are
+    added when it is first visited, so lazy nodes are only created for the
+    parts of the tree a query touches."""
+
+    __slots__ = ("node", "children", "expanded")
+
+    def __init__(self, node: Optional[Node] = None):
+        self.node = node
+        self.children: Dict[str, "_TrieEntry"] = {}
+        self.expanded = node is None
+
+
+class _NodeIndex:
+    """Path index of a model (sub)tree: a flat dict for exact lookups and
+    a trie of path segments for wildcard queries, both filled on demand."""
+
+    def __init__(self, root: Node):
+        self.generation = Node._path_generation
+        self.by_path: Dict[str, Node] = {root.get_path(): root}
+        self.trie = _TrieEntry(root)
+
+    def _children(self, entry: _TrieEntry) -> Dict[str, _TrieEntry]:
+        if not entry.expanded:
+            entry.expanded = True
+            for child in entry.node._child_nodes():  # type: ignore
+                child_entry = entry
+                # Names of collection elements may span several segments.
+                for segment in child.name.split("."):
+                    child_entry = child_entry.children.setdefault(segment, _TrieEntry())
+                child_entry.node = child
+                child_entry.expanded = False
+                self.by_path[child.get_path()] = child
+        return entry.children
+
+    def is_stale(self) -> bool:
+        return self.generation != Node._path_generation
+
+    def match(self, segments: List[str]) -> List[Node]:
+        """Match path segments below the root, where '*' matches exactly one
+        segment and '**' matches any number of segments, including none."""
+        entries = [self.trie]
+        for segment in segments:
+            if segment == "**":
+                entries = list(self._descendants(entries))
+            elif segment == "*":
+                entries = [
+                    child
+                    for entry in entries
+                    for child in self._children(entry).values()
+                ]
+            else:
+                entries = [
+                    self._children(entry)[segment]
+                    for entry in entries
+                    if segment in self._children(entry)
+                ]
+
+        nodes: Dict[int, Node] = {}
+        for entry in entries:
+            if entry.node is not None:
+                nodes.setdefault(id(entry.node), entry.node)
+        return list(nodes.values())
+
+    def _descendants(self, entries: List[_TrieEntry]) -> Iterator[_TrieEntry]:
+        seen = set()
+        stack = list(reversed(entries))
+        while stack:
+            entry = stack.pop()
+            if id(entry) in seen:
+                continue
+            seen.add(id(entry))
+            yield entry
+            stack.extend(reversed(list(self._children(entry).values())))
+
+
 class Model(Node):
     """The Model class represents a branch of the model tree, including root.
     Leafs are typcially one of the typed DataPoint* classes.
     But also a Model class can be a leaf, if it does not contain data Points,
     just methods."""
 
+    _node_index: Optional[_NodeIndex] = None
+
     def set_many(self) -> BatchSetBuilder:
         return BatchSetBuilder(self.get_client())
 
-    def getNode(self, datapoint_str: str) -> Node:
-        if self.get_path() not in datapoint_str:
-            raise ValueError("Input string has to start with the root")
-        nodes = datapoint_str.split(".")
-        dataPoint = self
+    async def get_many(self, *datapoints: TypedDataPoint) -> List[TypedDataPointResult]:
+        """Read several data points with a single GetDatapoints call.
+        The results are returned in the order of the given data points:
+
+        speed, temperature = await model.get_many(
+            model.Speed, model.Cabin.HVAC.AmbientAirTemperature
+        )
+        """
+        try:
+            return await get_datapoints(self.get_client(), datapoints)
+        except (grpc.aio.AioRpcError, Exception):  # type: ignore
+            logger.error("Error occured in Model.get_many")
+            raise
 
-        if len(nodes) > 1:
-            for node in nodes[1:]:
-                try:
-                    dataPoint = getattr(dataPoint, node)
-                except Exception as err:
-                    raise AttributeError("Node not found") from err
+    def _get_node_index(self) -> _NodeIndex:
+        """Return the path index of this subtree, (re)built on first use and
+        after any node of the tree has been renamed or re-parented."""
+        index = self._node_index
+        if index is None or index.is_stale():
+            index = self._node_index = _NodeIndex(self)
+        return index
+
+    def _relative_segments(self, datapoint_str: str) -> List[str]:
+        root_path = self.get_path()
+        if datapoint_str == root_path:
+            return []
+        if not datapoint_str.startswith(root_path + "."):
+            raise ValueError("Input string has to start with the root")
+        return datapoint_str[len(root_path) + 1 :].split(".")
 
+    def getNode(self, datapoint_str: str) -> Node:
+        index = self._get_node_index()
+        node = index.by_path.get(datapoint_str)
+        if node is not None:
+            return node
+
+        # First lookup of the path: walk the attributes, which also creates
+        # lazy nodes on the way, and remember the result.
+        segments = self._relative_segments(datapoint_str)
+        dataPoint: Node = self
+        try:
+            for segment in segments:
+                dataPoint = getattr(dataPoint, segment)
+        except Exception as err:
+            # Renamed nodes and collection elements are found by their names.
+            matches = [] if "*" in datapoint_str else index.match(segments)
+            if not matches:
+                raise AttributeError("Node not found") from err
+            dataPoint = matches[0]
+
+        if isinstance(dataPoint, Node):
+            index.by_path[datapoint_str] = dataPoint
         return dataPoint
 
+    def getNodes(self, pattern: str) -> List[Node]:
+        """Return all nodes matching a path pattern, e.g.
+        'Vehicle.Cabin.Seat.*' for the direct children of Seat or
+        'Vehicle.Cabin.**' for the whole Cabin subtree."""
+        segments = self._relative_segments(pattern)
+        return self._get_node_index().match(segments)
+
 
 class Service(Node):
     """The Service class contains a set of gRPC methods"""
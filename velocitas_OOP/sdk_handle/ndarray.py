@@ -0,0 +1,81 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Any
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, only needed for NumPy arrays
+    numpy = None
+
+# Element dtype of each array field of the broker Datapoint.
+DTYPES = {
+    "bool_array": "?",
+    "int32_array": "<i4",
+    "int64_array": "<i8",
+    "uint32_array": "<u4",
+    "uint64_array": "<u8",
+    "float_array": "<f4",
+    "double_array": "<f8",
+}
+# The protobuf runtime does not expose the memory of repeated fields. Float
+# and double values are packed with a fixed width though, so the serialized
+# message is the tag, the length and the raw little-endian values, converted
+# with one copy in C and no Python objects per element. Integers are
+# varint-encoded and go through a list.
+_FIXED_WIDTH = frozenset(("float_array", "double_array"))
+# Tag of the packed repeated field "values" (field 1, length-delimited).
+_VALUES_TAG = b"\x0a"
+
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError("NumPy arrays need the numpy package to be installed")
+
+
+def to_ndarray(message, field: str) -> Any:
+    """Values of an array message as a NumPy array. Float and double arrays
+    are read-only views of the serialized message. String arrays are
+    returned as list."""
+    if field not in DTYPES:
+        return message.values[:]
+    if field in _FIXED_WIDTH:
+        data = message.SerializeToString()
+        if not data:
+            return numpy.empty(0, DTYPES[field])
+        offset = 1
+        while data[offset] & 0x80:
+            offset += 1
+        return numpy.frombuffer(data, DTYPES[field], offset=offset + 1)
+    return numpy.array(message.values[:], DTYPES[field])
+
+
+def from_ndarray(array_type, field: str, value) -> Any:
+    """Array message of the given type holding the values of a NumPy array."""
+    if field in _FIXED_WIDTH:
+        payload = numpy.ascontiguousarray(value, DTYPES[field]).tobytes()
+        if not payload:
+            return array_type()
+        return array_type.FromString(_VALUES_TAG + _varint(len(payload)) + payload)
+    return array_type(values=value.tolist())
+
+
+def _varint(number: int) -> bytes:
+    encoded = bytearray()
+    while number > 0x7F:
+        encoded.append((number & 0x7F) | 0x80)
+        number >>= 7
+    encoded.append(number)
+    return bytes(encoded)
+
@@ -0,0 +1,119 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence
+
+import grpc
+
+from velocitas_sdk.proto.broker_pb2_grpc import BrokerStub
+from velocitas_sdk.proto.collector_pb2_grpc import CollectorStub
+
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+
+
+class ChannelPool:
+    """A fixed number of gRPC channels to the broker, each with its own
+    HTTP/2 connection and BrokerStub.
+
+    Unary calls pick a channel round robin or by the least number of
+    outstanding requests, among the channels without streams as long as
+    there is one. Subscription streams are placed on the channel with the
+    fewest streams, starting from the last one, so that with more than one
+    channel the first channels stay free of streams for as long as possible.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        size: int = 1,
+        selection: str = ROUND_ROBIN,
+        interceptors: Optional[Sequence] = None,
+    ):
+        if size < 1:
+            raise ValueError(f"Channel pool size must be at least 1, got {size}")
+        if selection not in (ROUND_ROBIN, LEAST_OUTSTANDING):
+            raise ValueError(f"Unknown channel selection '{selection}'")
+
+        self.selection = selection
+        # Without a local subchannel pool, channels to the same target would
+        # share one connection.
+        options = [("grpc.use_local_subchannel_pool", 1)] if size > 1 else None
+        self.channels: List[grpc.aio.Channel] = [  # type: ignore
+            grpc.aio.insecure_channel(  # type: ignore
+                address, options=options, interceptors=interceptors
+            )
+            for _ in range(size)
+        ]
+        self.stubs = [BrokerStub(channel) for channel in self.channels]
+        self.collector_stubs = [CollectorStub(channel) for channel in self.channels]
+        self.outstanding = [0] * size
+        self.streams = [0] * size
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def _select_unary(self) -> int:
+        size = len(self.stubs)
+        # Channels carrying streams are only used when all of them do.
+        free = [i for i in range(size) if not self.streams[i]] or list(range(size))
+        if self.selection == LEAST_OUTSTANDING:
+            return min(free, key=lambda i: self.outstanding[i])
+        index = next((i for i in free if i >= self._next), free[0])
+        self._next = (index + 1) % size
+        return index
+
+    @contextmanager
+    def unary(self, stubs: Optional[List] = None) -> Iterator[BrokerStub]:
+        """Select a stub for one unary call and count it as outstanding.
+        Broker stubs are used unless stubs (e.g. collector_stubs) is given."""
+        index = self._select_unary()
+        self.outstanding[index] += 1
+        try:
+            yield (self.stubs if stubs is None else stubs)[index]
+        finally:
+            self.outstanding[index] -= 1
+
+    def subscribe(self, request, metadata):
+        """Open a Subscribe stream on the channel with the fewest streams."""
+        return self._open_stream(
+            lambda index: self.stubs[index].Subscribe(request, metadata=metadata)
+        )
+
+    def stream_datapoints(self, metadata):
+        """Open a Collector StreamDatapoints stream on the channel with the
+        fewest streams."""
+        return self._open_stream(
+            lambda index: self.collector_stubs[index].StreamDatapoints(
+                metadata=metadata
+            )
+        )
+
+    def _open_stream(self, open_call):
+        index = min(reversed(range(len(self.stubs))), key=lambda i: self.streams[i])
+        call = open_call(index)
+        self.streams[index] += 1
+
+        def release(_):
+            self.streams[index] -= 1
+
+        call.add_done_callback(release)
+        return call
+
+    async def close(self):
+        for channel in self.channels:
+            await channel.close()
+
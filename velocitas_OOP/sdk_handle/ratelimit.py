@@ -0,0 +1,178 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import bisect
+import itertools
+import time
+from typing import Any, Collection, Dict, List, MutableMapping, Optional, Tuple
+
+# Priority lanes of writes, lower values are sent first.
+CRITICAL = 0
+NORMAL = 1
+BULK = 2
+
+
+class TokenBucket:
+    """Allows rate operations per second on average and bursts of up to
+    burst operations."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = max(rate, 1.0) if burst is None else burst
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """Seconds until an operation is allowed, 0 if it is allowed now."""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def take(self):
+        self._tokens -= 1.0
+
+
+class WriteRateLimiter:
+    """Token buckets limiting the SetDatapoints calls of a client and the
+    writes of each path.
+
+    Writes over the limit wait in priority order, first in first out within a
+    lane; a waiting write also holds back later writes of the same paths, so
+    writes of a path are never reordered. CRITICAL writes bypass the limiter:
+    they neither wait nor use tokens, and their paths are removed from the
+    writes still held back, which would overwrite them otherwise.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        path_rate: Optional[float] = None,
+        path_burst: Optional[float] = None,
+    ):
+        self._bucket = None if rate is None else TokenBucket(rate, burst)
+        self.path_rate = path_rate
+        self.path_burst = path_burst
+        self._path_buckets: Dict[str, TokenBucket] = {}
+        self._waiters: List[Tuple[int, int, Collection[str], asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Writes held back, until they are sent or superseded.
+        self._held: Dict[int, MutableMapping[str, Any]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.delayed = 0
+        self.bypassed = 0
+
+    def limit_path(self, path: str, rate: float, burst: Optional[float] = None):
+        """Limit the writes of one path, overriding path_rate."""
+        self._path_buckets[path] = TokenBucket(rate, burst)
+
+    async def acquire(
+        self, datapoints: MutableMapping[str, Any], priority: int = NORMAL
+    ):
+        """Wait until a write of the given datapoints is allowed. Paths
+        superseded by a CRITICAL write meanwhile are removed from
+        datapoints; the write is void once it is empty."""
+        if priority == CRITICAL:
+            self.bypassed += 1
+            self.supersede(datapoints)
+            return
+        if not self._waiters and self._delay(datapoints, time.monotonic()) == 0:
+            self._take(datapoints)
+            return
+
+        self.delayed += 1
+        future = asyncio.get_running_loop().create_future()
+        sequence = next(self._sequence)
+        self._held[sequence] = datapoints
+        bisect.insort(self._waiters, (priority, sequence, datapoints, future))
+        self._dispatch()
+        try:
+            await future
+        finally:
+            del self._held[sequence]
+            if future.cancelled():
+                self._dispatch()
+
+    def supersede(self, paths: Collection[str]):
+        """Remove paths from the writes held back; emptied writes stop
+        waiting."""
+        for datapoints in self._held.values():
+            for path in paths:
+                datapoints.pop(path, None)  # type: ignore
+        if any(not waiter[2] and not waiter[3].done() for waiter in self._waiters):
+            for waiter in self._waiters:
+                if not waiter[2] and not waiter[3].done():
+                    waiter[3].set_result(None)
+            self._dispatch()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "waiting": sum(not waiter[3].done() for waiter in self._waiters),
+            "delayed": self.delayed,
+            "bypassed": self.bypassed,
+        }
+
+    def _path_bucket(self, path: str) -> Optional[TokenBucket]:
+        bucket = self._path_buckets.get(path)
+        if bucket is None and self.path_rate is not None:
+            bucket = TokenBucket(self.path_rate, self.path_burst)
+            self._path_buckets[path] = bucket
+        return bucket
+
+    def _delay(self, paths: Collection[str], now: float) -> float:
+        delay = 0.0 if self._bucket is None else self._bucket.delay(now)
+        for path in paths:
+            bucket = self._path_bucket(path)
+            if bucket is not None:
+                delay = max(delay, bucket.delay(now))
+        return delay
+
+    def _take(self, paths: Collection[str]):
+        if self._bucket is not None:
+            self._bucket.take()
+        for path in paths:
+            bucket = self._path_bucket(path)
+            if bucket is not None:
+                bucket.take()
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        waiting = []
+        blocked = set()
+        wait = None
+        for waiter in self._waiters:
+            paths, future = waiter[2], waiter[3]
+            if future.done():
+                continue
+            if blocked.isdisjoint(paths):
+                delay = self._delay(paths, now)
+                if delay == 0:
+                    self._take(paths)
+                    future.set_result(None)
+                    continue
+                wait = delay if wait is None else min(wait, delay)
+            blocked.update(paths)
+            waiting.append(waiter)
+        self._waiters = waiting
+        if wait is not None:
+            self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+
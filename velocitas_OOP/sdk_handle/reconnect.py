@@ -0,0 +1,127 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ExponentialBackoff:
+    """Reconnect delays growing exponentially up to a cap, with full jitter
+    so that many subscriptions do not retry at the same moment."""
+
+    def __init__(
+        self, initial: float = 0.1, maximum: float = 30.0, multiplier: float = 2.0
+    ):
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+
+    def delay(self, attempt: int) -> float:
+        ceiling = min(self.maximum, self.initial * self.multiplier**attempt)
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Gate shared by all subscription streams of one broker.
+
+    After failure_threshold consecutive connection failures the breaker
+    opens and every stream waits reset_timeout seconds. Then a single
+    stream probes the broker: on success all streams reconnect (spread over
+    release_jitter seconds), on failure the breaker opens again with a
+    doubled timeout, capped at max_reset_timeout. A stream succeeds with its
+    first reply or when it stayed up for success_after seconds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 1.0,
+        max_reset_timeout: float = 60.0,
+        release_jitter: float = 0.5,
+        success_after: float = 1.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.release_jitter = release_jitter
+        self.success_after = success_after
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._timeout = reset_timeout
+        self._open_until = 0.0
+        self._changed = asyncio.Event()
+
+    def _transition(self, state: str):
+        logger.info("Broker circuit breaker %s -> %s", self.state, state)
+        self.state = state
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_until_allowed(self) -> bool:
+        """Return when a connection attempt may be made; True if the caller
+        is the probe and must report its result."""
+        waited = False
+        while self.state != self.CLOSED:
+            waited = True
+            if self.state == self.OPEN:
+                remaining = self._open_until - time.monotonic()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+                    continue
+                # This caller probes the broker, the others wait for its result.
+                self._transition(self.HALF_OPEN)
+                return True
+            await self._changed.wait()
+
+        if waited and self.release_jitter > 0:
+            await asyncio.sleep(random.uniform(0, self.release_jitter))
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self._timeout = self.reset_timeout
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+            self._open()
+        elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+
+    def abandon_probe(self):
+        """Let another waiting stream probe, e.g. when the probe was cancelled."""
+        if self.state == self.HALF_OPEN:
+            self._open_until = 0.0
+            self._transition(self.OPEN)
+
+    def _open(self):
+        self.opened += 1
+        self._open_until = time.monotonic() + self._timeout
+        self._transition(self.OPEN)
+
+    def stats(self) -> Dict[str, Union[str, int]]:
+        return {"state": self.state, "failures": self.failures, "opened": self.opened}
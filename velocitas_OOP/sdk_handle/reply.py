@@ -30,6 +30,12 @@ class DataPointReply:
     def __init__(self, reply: SubscribeReply):
         self.reply = reply
 
+    def __reduce__(self):
+        # The generated messages cannot be pickled by reference to their
+        # module, so the reply is pickled serialized, e.g. for callbacks
+        # running on a process pool.
+        return (_from_string, (self.reply.SerializeToString(),))
+
     @overload
     def get(
         self, datapoint: "model.DataPointBoolean"
@@ -131,43 +137,17 @@ class DataPointReply:
     ) -> TypedDataPointResult[List[int]]: ...
 
     def get(self, datapoint: "model.DataPoint"):
-        datapoint_type = datapoint.__class__.__name__
+        # The data point class carries its decoder (see TypedDataPoint), which
+        # reads only the requested field of the reply.
+        to_result = getattr(datapoint, "_to_result", None)
+        if to_result is None:
+            raise Exception(
+                f"Datapoint of type {datapoint.__class__.__name__} has an unknown value"
+            )
         vdb_datapoint: BrokerDatapoint = self.reply.fields[datapoint.get_path()]
-        datapoint_values = {
-            "DataPointBoolean": vdb_datapoint.bool_value,
-            "DataPointBooleanArray": list(vdb_datapoint.bool_array.values),
-            "DataPointString": vdb_datapoint.string_value,
-            "DataPointStringArray": list(vdb_datapoint.string_array.values),
-            "DataPointDouble": vdb_datapoint.double_value,
-            "DataPointDoubleArray": list(vdb_datapoint.double_array.values),
-            "DataPointFloat": vdb_datapoint.float_value,
-            "DataPointFloatArray": list(vdb_datapoint.float_array.values),
-            "DataPointInt8": vdb_datapoint.int32_value,
-            "DataPointInt8Array": list(vdb_datapoint.int32_array.values),
-            "DataPointInt16": vdb_datapoint.int32_value,
-            "DataPointInt16Array": list(vdb_datapoint.int32_array.values),
-            "DataPointInt32": vdb_datapoint.int32_value,
-            "DataPointInt32Array": list(vdb_datapoint.int32_array.values),
-            "DataPointInt64": vdb_datapoint.int64_value,
-            "DataPointInt64Array": list(vdb_datapoint.int64_array.values),
-            "DataPointUint8": vdb_datapoint.uint32_value,
-            "DataPointUint8Array": list(vdb_datapoint.uint32_array.values),
-            "DataPointUint16": vdb_datapoint.uint32_value,
-            "DataPointUint16Array": list(vdb_datapoint.uint32_array.values),
-            "DataPointUint32": vdb_datapoint.uint32_value,
-            "DataPointUint32Array": list(vdb_datapoint.uint32_array.values),
-            "DataPointUint64": vdb_datapoint.uint64_value,
-            "DataPointUint64Array": list(vdb_datapoint.uint64_array.values),
-        }
-        datapoint_value = datapoint_values.get(
-            datapoint_type,
-            Exception(f"Datapoint of type {datapoint_type} has an unknown value"),
-        )
-
-        if isinstance(datapoint_value, Exception):
-            raise datapoint_value
-
-        return TypedDataPointResult(
-            datapoint.get_path(), datapoint_value, vdb_datapoint.timestamp
-        )
+        return to_result(vdb_datapoint)
+
+
+def _from_string(data: bytes) -> DataPointReply:
+    return DataPointReply(SubscribeReply.FromString(data))
 
@@ -13,23 +13,57 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import asyncio
+import json
 import logging
+import time
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import grpc
 
+from velocitas_sdk.proto.broker_pb2 import SubscribeReply
+from velocitas_sdk.vdb.dispatch import DispatchQueue
+from velocitas_sdk.vdb.filters import DeliveryFilter
+from velocitas_sdk.vdb.health import RateMeter, SubscriptionHealth, describe_error
+from velocitas_sdk.vdb.reconnect import ExponentialBackoff
 from velocitas_sdk.vdb.reply import DataPointReply
 
 logger = logging.getLogger(__name__)
 
 
+class _SharedStream:
+    """One broker Subscribe stream whose replies are fanned out to every
+    subscription with the same client and query."""
+
+    def __init__(self, vdb_client, query: str, conditions: Tuple[str, ...] = ()):
+        self.vdb_client = vdb_client
+        self.query = query
+        # The broker sends replies of a conditional query only while the
+        # conditions hold, so they do not keep the value cache current.
+        self.caches_values = not conditions
+        self.subscriptions: List["VdbSubscription"] = []
+        self.task: Optional[asyncio.Task] = None
+        # Failed connection attempts since the stream was last connected.
+        self.attempt = 0
+        self.reconnects = 0
+        # Whether the current connection got a reply or stayed up long enough.
+        self.connected = False
+        self.replies = RateMeter()
+        self.last_error: Optional[str] = None
+
+
 class SubscriptionManager:
     """Helper for subscription handling."""
 
     _subscription_tasks = {}  # type: ignore
+    _streams: Dict[Tuple[Any, str], _SharedStream] = {}
+    _trailing_tasks: Set[asyncio.Task] = set()
+    backoff = ExponentialBackoff()
+    reconnect_attempts = 0
 
     @staticmethod
     async def remove_all_subscriptions():
-        for task in SubscriptionManager._subscription_tasks.items():
+        for task in list(SubscriptionManager._subscription_tasks.items()):
             try:
                 await SubscriptionManager._remove_subscription(task[0])
             except Exception as ex:
@@ -38,15 +72,80 @@ class SubscriptionManager:
     @staticmethod
     def list_all_subscription():
         queries = []
-        for task in SubscriptionManager._subscription_tasks.items():
-            if not (task[1].cancelled() or task[1].done()):
-                queries.append(task[1].get_name())
+        for stream in SubscriptionManager._streams.values():
+            task = stream.task
+            if task is not None and not (task.cancelled() or task.done()):
+                queries.append(task.get_name())
         return queries
 
+    @staticmethod
+    def subscription_health() -> List[Dict[str, Any]]:
+        """Health of each subscription: replies received by its stream and
+        their rate, reconnects and last error of the stream, lag and
+        callback duration summaries and, if set, dispatch queue and delivery
+        filter counters."""
+        health = []
+        for stream in SubscriptionManager._streams.values():
+            for vdb_sub in stream.subscriptions:
+                stats: Dict[str, Any] = {
+                    "query": stream.query,
+                    "replies": stream.replies.count,
+                    "replies_per_second": stream.replies.rate,
+                    "reconnects": stream.reconnects,
+                    "last_error": stream.last_error,
+                }
+                stats.update(vdb_sub.health.stats())
+                if vdb_sub.queue is not None:
+                    stats["queue"] = vdb_sub.queue.stats()
+                if vdb_sub.delivery_filter is not None:
+                    stats["filter"] = vdb_sub.delivery_filter.stats()
+                health.append(stats)
+        return health
+
+    @staticmethod
+    def start_health_log(interval: float = 60.0) -> asyncio.Task:
+        """Log subscription_health() every interval seconds, one JSON line
+        per subscription, until the returned task is cancelled."""
+
+        async def log_health():
+            while True:
+                await asyncio.sleep(interval)
+                for stats in SubscriptionManager.subscription_health():
+                    logger.info(
+                        "Subscription health %s",
+                        json.dumps(stats),
+                        extra={"subscription_health": stats},
+                    )
+
+        return asyncio.create_task(log_health(), name="SubscriptionHealthLog")
+
+    @staticmethod
+    def _is_subscribed(vdb_sub) -> bool:
+        stream = SubscriptionManager._streams.get((vdb_sub.vdb_client, vdb_sub.query))
+        return stream is not None and vdb_sub in stream.subscriptions
+
     @staticmethod
     async def _remove_subscription(vdb_sub):
+        task = SubscriptionManager._subscription_tasks[vdb_sub]
+        if vdb_sub.queue is not None:
+            vdb_sub.queue.close()
+        if vdb_sub.trailing is not None:
+            vdb_sub.trailing.cancel()
+            vdb_sub.trailing = None
+        key = (vdb_sub.vdb_client, vdb_sub.query)
+        stream = SubscriptionManager._streams.get(key)
+        if stream is not None and stream.task is task:
+            if vdb_sub not in stream.subscriptions:
+                # Already unsubscribed, the stream serves other subscriptions.
+                return task
+            stream.subscriptions.remove(vdb_sub)
+            if stream.subscriptions:
+                logger.info("Unsubscribed from shared stream %s", stream.query)
+                return task
+            # Last subscription of the stream: close it.
+            del SubscriptionManager._streams[key]
+
         try:
-            task = SubscriptionManager._subscription_tasks[vdb_sub]
             if not task.cancelled():
                 task.cancel()
                 await task
@@ -64,60 +163,247 @@ class SubscriptionManager:
     @staticmethod
     def _add_subscription(vdb_sub):
         try:
-            task = asyncio.create_task(
-                SubscriptionManager._subscribe_to_data_points_forever(vdb_sub),
-                name=vdb_sub.query,
-            )
-            SubscriptionManager._subscription_tasks[vdb_sub] = task
-            logger.info("Subscribing to %s", vdb_sub.query)
-            return task
+            key = (vdb_sub.vdb_client, vdb_sub.query)
+            stream = SubscriptionManager._streams.get(key)
+            if stream is None or stream.task is None or stream.task.done():
+                stream = _SharedStream(
+                    vdb_sub.vdb_client, vdb_sub.query, vdb_sub.conditions
+                )
+                stream.task = asyncio.create_task(
+                    SubscriptionManager._subscribe_to_data_points_forever(stream),
+                    name=vdb_sub.query,
+                )
+                SubscriptionManager._streams[key] = stream
+                logger.info("Subscribing to %s", vdb_sub.query)
+            else:
+                logger.info("Sharing subscription stream of %s", vdb_sub.query)
+
+            stream.subscriptions.append(vdb_sub)
+            SubscriptionManager._subscription_tasks[vdb_sub] = stream.task
+            if vdb_sub.queue is not None:
+                vdb_sub.queue.start(
+                    lambda reply: SubscriptionManager._call_back(
+                        vdb_sub, DataPointReply(reply)
+                    ),
+                    name=f"Dispatch {vdb_sub.query}",
+                )
+            return stream.task
         except (grpc.aio.AioRpcError, Exception):  # type: ignore
             logger.exception("Error occured in SubscriptionManager._add_subscription.")
             raise
 
+    @staticmethod
+    async def _call_back(vdb_sub, reply_wrapper: DataPointReply):
+        health = vdb_sub.health
+        health.observe_lag(reply_wrapper.reply.fields)
+        start = time.perf_counter()
+        try:
+            if vdb_sub.executor is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    vdb_sub.executor, vdb_sub.call_back, reply_wrapper
+                )
+            elif vdb_sub.is_coroutine:
+                await vdb_sub.call_back(reply_wrapper)
+            else:
+                vdb_sub.call_back(reply_wrapper)
+        except Exception as ex:
+            # Keep serving the other subscriptions of the stream.
+            health.last_error = describe_error(ex)
+            logger.exception(
+                "Error occured in subscription callback of %s", vdb_sub.query
+            )
+        finally:
+            health.callback_duration.observe(time.perf_counter() - start)
+
+    @staticmethod
+    async def _deliver(vdb_sub, reply: SubscribeReply):
+        if vdb_sub.queue is not None:
+            await vdb_sub.queue.put(reply)
+        else:
+            await SubscriptionManager._call_back(vdb_sub, DataPointReply(reply))
+
+    @staticmethod
+    def _schedule_trailing(vdb_sub):
+        """Deliver the values held back by the delivery filter of vdb_sub once
+        its min_interval has passed, unless a later reply delivers them."""
+        if vdb_sub.trailing is not None:
+            return
+        delay = vdb_sub.delivery_filter.trailing_delay()
+        if delay is None:
+            return
+        vdb_sub.trailing = asyncio.get_running_loop().call_later(
+            delay, SubscriptionManager._start_trailing, vdb_sub
+        )
+
+    @staticmethod
+    def _start_trailing(vdb_sub):
+        vdb_sub.trailing = None
+        task = asyncio.create_task(
+            SubscriptionManager._deliver_trailing(vdb_sub),
+            name=f"Trailing {vdb_sub.query}",
+        )
+        SubscriptionManager._trailing_tasks.add(task)
+        task.add_done_callback(SubscriptionManager._trailing_tasks.discard)
+
+    @staticmethod
+    async def _deliver_trailing(vdb_sub):
+        fields = vdb_sub.delivery_filter.flush()
+        if fields is not None:
+            await SubscriptionManager._deliver(vdb_sub, SubscribeReply(fields=fields))
+
+    @staticmethod
+    def _mark_connected(stream: _SharedStream):
+        stream.connected = True
+        stream.attempt = 0
+        stream.vdb_client.circuit_breaker.record_success()
+
     # @retry((grpc.aio.AioRpcError), delay=2)
     @staticmethod
-    async def _subscribe_to_data_points(vdb_sub):
+    async def _subscribe_to_data_points(stream: _SharedStream):
+        vdb_client = stream.vdb_client
+        stream.connected = False
+        cached_paths = set()
+        # The broker may only send headers with the first reply, so a stream
+        # also counts as connected once it stayed up for a while.
+        connected = False
+        confirm = asyncio.get_running_loop().call_later(
+            vdb_client.circuit_breaker.success_after,
+            SubscriptionManager._mark_connected,
+            stream,
+        )
         try:
-            async for reply in vdb_sub.vdb_client.Subscribe(vdb_sub.query):
-                reply_wrapper = DataPointReply(reply)
-                if asyncio.iscoroutinefunction(vdb_sub.call_back):
-                    await vdb_sub.call_back(reply_wrapper)
-                else:
-                    vdb_sub.call_back(reply_wrapper)
+            async for reply in vdb_client.Subscribe(stream.query):
+                if not connected:
+                    connected = True
+                    confirm.cancel()
+                    SubscriptionManager._mark_connected(stream)
+                stream.replies.mark()
+                cache = vdb_client.value_cache
+                if cache is not None and stream.caches_values:
+                    cache.update(reply.fields)
+                    cached_paths.update(reply.fields)
+                suppressor = vdb_client.change_suppressor
+                if suppressor is not None:
+                    suppressor.observe(reply.fields)
+                reply_wrapper = None
+                reply_fields = reply.fields
+                for vdb_sub in tuple(stream.subscriptions):
+                    delivery_filter = vdb_sub.delivery_filter
+                    if delivery_filter is not None:
+                        fields = delivery_filter.accept(reply_fields)
+                        if fields is None:
+                            SubscriptionManager._schedule_trailing(vdb_sub)
+                            continue
+                        if fields is not reply_fields:
+                            # Held back values delivered along with this reply.
+                            await SubscriptionManager._deliver(
+                                vdb_sub, SubscribeReply(fields=fields)
+                            )
+                            continue
+                    if vdb_sub.queue is not None:
+                        await vdb_sub.queue.put(reply)
+                        continue
+                    if reply_wrapper is None:
+                        reply_wrapper = DataPointReply(reply)
+                    await SubscriptionManager._call_back(vdb_sub, reply_wrapper)
         except (grpc.aio.AioRpcError, Exception):  # type: ignore
             logger.exception(
                 "Error occured in SubscriptionManager.subscribe_to_data_points."
             )
             raise
+        finally:
+            confirm.cancel()
+            # Values of a broken or cancelled stream are no longer kept current.
+            cache = vdb_client.value_cache
+            if cache is not None:
+                cache.invalidate(cached_paths)
 
     @staticmethod
-    async def _subscribe_to_data_points_forever(vdb_sub):
+    async def _subscribe_to_data_points_forever(stream: _SharedStream):
+        breaker = stream.vdb_client.circuit_breaker
         while True:
+            probing = await breaker.wait_until_allowed()
             try:
-                await SubscriptionManager._subscribe_to_data_points(vdb_sub)
+                await SubscriptionManager._subscribe_to_data_points(stream)
+            except asyncio.CancelledError:
+                if probing:
+                    breaker.abandon_probe()
+                raise
             except (grpc.aio.AioRpcError, Exception) as ex:  # type: ignore
+                stream.last_error = describe_error(ex)
                 logger.debug(
                     "Error in subscription -> {Subscription: %s}",
-                    SubscriptionManager._subscription_tasks[vdb_sub],
+                    stream.task,
                 )
                 logger.exception(ex)
                 if isinstance(ex, (grpc.aio.AioRpcError)):  # type: ignore
                     if ex.code() is grpc.StatusCode.INVALID_ARGUMENT:
+                        # The broker answered, so it is reachable.
+                        breaker.record_success()
                         raise
-                    logger.debug("Retrying after 2.5 seconds")
-                    await asyncio.sleep(2.5)
+                    breaker.record_failure()
+                    await SubscriptionManager._back_off(stream)
                 else:
+                    if probing:
+                        breaker.abandon_probe()
                     raise
+            else:
+                # The broker ended the stream without an error. Ending before
+                # it counted as connected is a failed attempt; either way the
+                # stream is reopened after a delay, not right away.
+                logger.info("Subscription stream %s ended", stream.query)
+                if not stream.connected:
+                    breaker.record_failure()
+                await SubscriptionManager._back_off(stream)
+
+    @staticmethod
+    async def _back_off(stream: _SharedStream):
+        delay = SubscriptionManager.backoff.delay(stream.attempt)
+        stream.attempt += 1
+        stream.reconnects += 1
+        SubscriptionManager.reconnect_attempts += 1
+        logger.debug("Retrying after %.2f seconds", delay)
+        await asyncio.sleep(delay)
 
 
 class VdbSubscription:
-    """Expose subscription handling to client."""
+    """Expose subscription handling to client.
+
+    Without a queue the callback is called by the stream of the
+    subscription, which waits for it; with a DispatchQueue the callback runs
+    in a task of its own.
+
+    A plain callback given an executor runs on it instead of the event loop,
+    one call at a time, so replies are still handled in order. For a
+    ProcessPoolExecutor the callback and the replies have to be picklable.
+
+    Replies rejected by the delivery filter are dropped before they are
+    queued or wrapped; values it held back for min_interval are delivered
+    once the interval has passed."""
 
-    def __init__(self, vdb_client=None, query=None, call_back=None):
+    def __init__(
+        self,
+        vdb_client=None,
+        query=None,
+        call_back=None,
+        queue: Optional[DispatchQueue] = None,
+        executor: Optional[Executor] = None,
+        delivery_filter: Optional[DeliveryFilter] = None,
+        conditions: Tuple[str, ...] = (),
+    ):
         self.query = query
+        self.conditions = conditions
         self.vdb_client = vdb_client
         self.call_back = call_back
+        self.queue = queue
+        self.executor = executor
+        self.delivery_filter = delivery_filter
+        # Timer delivering values held back by the delivery filter.
+        self.trailing: Optional[asyncio.TimerHandle] = None
+        self.health = SubscriptionHealth()
+        self.is_coroutine = asyncio.iscoroutinefunction(call_back)
+        if executor is not None and self.is_coroutine:
+            raise ValueError("Coroutine callbacks cannot run on an executor")
 
     async def unsubscribe(self):
         try:
@@ -129,8 +415,8 @@ class VdbSubscription:
     async def subscribe(self):
         try:
             task = SubscriptionManager._subscription_tasks[self]
-            if task.cancelled():
-                SubscriptionManager._add_subscription(self)
+            if not SubscriptionManager._is_subscribed(self):
+                task = SubscriptionManager._add_subscription(self)
             return task
         except Exception as ex:
             logger.exception(ex)
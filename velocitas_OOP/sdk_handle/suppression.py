@@ -0,0 +1,91 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Dict, Mapping
+
+from velocitas_sdk.proto.types_pb2 import Datapoint as BrokerDatapoint
+
+_FLOAT_FIELDS = frozenset(
+    ("float_value", "double_value", "float_array", "double_array")
+)
+
+
+def _unchanged(old: BrokerDatapoint, new: BrokerDatapoint, epsilon: float) -> bool:
+    field = new.WhichOneof("value")
+    if field is None or field == "failure_value" or field != old.WhichOneof("value"):
+        return False
+
+    old_value = getattr(old, field)
+    new_value = getattr(new, field)
+    use_epsilon = epsilon > 0 and field in _FLOAT_FIELDS
+    if field.endswith("_array"):
+        old_value = old_value.values
+        new_value = new_value.values
+        if len(old_value) != len(new_value):
+            return False
+        if use_epsilon:
+            return all(abs(a - b) <= epsilon for a, b in zip(old_value, new_value))
+        return list(old_value) == list(new_value)
+
+    if use_epsilon:
+        return abs(old_value - new_value) <= epsilon
+    return old_value == new_value
+
+
+class ChangeSuppressor:
+    """Skips writes of values equal to the last value written or observed for
+    a path. Only watched paths are compared; float values and arrays may use
+    an epsilon, all other types must match exactly.
+
+    A value changed by another client is only noticed when it is observed,
+    i.e. read with get() or received on a subscription.
+    """
+
+    def __init__(self):
+        self.suppressed = 0
+        self.suppressed_by_path: Dict[str, int] = {}
+        self._epsilons: Dict[str, float] = {}
+        self._last: Dict[str, BrokerDatapoint] = {}
+
+    def watch(self, path: str, epsilon: float = 0.0):
+        self._epsilons[path] = epsilon
+
+    def unwatch(self, path: str):
+        self._epsilons.pop(path, None)
+        self._last.pop(path, None)
+
+    def observe(self, datapoints: Mapping[str, BrokerDatapoint]):
+        """Record values written to or received from the broker."""
+        if not self._epsilons:
+            return
+        for path, datapoint in datapoints.items():
+            if path in self._epsilons:
+                self._last[path] = datapoint
+
+    def filter(
+        self, datapoints: Mapping[str, BrokerDatapoint]
+    ) -> Dict[str, BrokerDatapoint]:
+        """Return the datapoints whose value differs from the last known one."""
+        changed = {}
+        for path, datapoint in datapoints.items():
+            last = self._last.get(path)
+            if last is not None and _unchanged(last, datapoint, self._epsilons[path]):
+                self.suppressed += 1
+                self.suppressed_by_path[path] = self.suppressed_by_path.get(path, 0) + 1
+            else:
+                changed[path] = datapoint
+        return changed
+
+    def stats(self) -> Dict[str, int]:
+        return {"watched": len(self._epsilons), "suppressed": self.suppressed}
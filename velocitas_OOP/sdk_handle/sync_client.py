@@ -0,0 +1,174 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from velocitas_sdk.model import get_datapoints
+from velocitas_sdk.vdb.client import VehicleDataBrokerClient
+from velocitas_sdk.vdb.pool import ROUND_ROBIN
+
+logger = logging.getLogger(__name__)
+
+
+def _copy_result(future: Future, task: asyncio.Task):
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())  # type: ignore
+    else:
+        future.set_result(task.result())
+
+
+class SyncVehicleDataBrokerClient:
+    """Blocking access to the broker for threaded code without an event loop.
+
+    A daemon thread runs an event loop that owns the VehicleDataBrokerClient
+    and its channels. get(), set(), get_many() and run() can be called from
+    any thread; they hand the call to the loop and block until it is done.
+    Calls are queued and the loop is woken once per batch, so callers
+    submitting at the same time share one wakeup:
+
+    with SyncVehicleDataBrokerClient() as vdb:
+        speed = vdb.get(vehicle.Speed).value
+        vdb.set(vehicle.Body.Lights.Beam.Low.IsOn, True)
+
+    The client is a singleton, so it must not be created on another event
+    loop before and only one facade may be open at a time. close() closes
+    the client; a facade opened afterwards creates a new one. Subscription
+    callbacks registered through run() are called on the loop thread; they
+    must await the client there, as calling the facade from the loop thread
+    raises RuntimeError.
+    """
+
+    def __init__(
+        self,
+        port: Optional[int] = None,
+        channels: int = 1,
+        selection: str = ROUND_ROBIN,
+        timeout: Optional[float] = None,
+        metrics: bool = False,
+    ):
+        self.timeout = timeout
+        self.submitted = 0
+        self.wakeups = 0
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[Callable[..., Awaitable], tuple, Future]] = []
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="vdb-client-loop", daemon=True
+        )
+        self._thread.start()
+        self.client: VehicleDataBrokerClient = self.run(
+            self._create_client, port, channels, selection, metrics
+        )
+
+    @staticmethod
+    async def _create_client(
+        port, channels, selection, metrics
+    ) -> VehicleDataBrokerClient:
+        return VehicleDataBrokerClient(port, channels, selection, metrics)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.close()
+
+    def submit(self, function: Callable[..., Awaitable], *args) -> Future:
+        """Run function(*args) on the loop thread; the returned future is
+        completed with its result."""
+        if threading.get_ident() == self._thread.ident:
+            # The loop would wait for a call only it can run.
+            raise RuntimeError(
+                "SyncVehicleDataBrokerClient cannot be called from its loop thread"
+            )
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SyncVehicleDataBrokerClient is closed")
+            self._pending.append((function, args, future))
+            self.submitted += 1
+            wake = len(self._pending) == 1
+            if wake:
+                self.wakeups += 1
+        if wake:
+            self._loop.call_soon_threadsafe(self._drain)
+        return future
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for function, args, future in pending:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                coroutine = function(*args)
+                if self.timeout is not None:
+                    coroutine = asyncio.wait_for(coroutine, self.timeout)
+                task = self._loop.create_task(coroutine)
+            except Exception as ex:
+                future.set_exception(ex)
+                continue
+            task.add_done_callback(partial(_copy_result, future))
+
+    def run(self, function: Callable[..., Awaitable], *args) -> Any:
+        """Block until function(*args) has run on the loop thread and return
+        its result. With a timeout set, calls taking longer are cancelled
+        and raise TimeoutError."""
+        return self.submit(function, *args).result()
+
+    def get(self, datapoint):
+        return self.run(datapoint.get)
+
+    def set(self, datapoint, value):
+        return self.run(datapoint.set, value)
+
+    def get_many(self, *datapoints) -> list:
+        """Read several data points with a single GetDatapoints call, see
+        Model.get_many()."""
+        return self.run(get_datapoints, self.client, datapoints)
+
+    def close(self):
+        """Close the channels and stop the loop thread. The client was
+        created for this facade and its loop, so it is dropped as singleton
+        as well: a facade opened afterwards creates a new one with its own
+        arguments."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result()
+        except Exception:
+            logger.exception("Error occured in SyncVehicleDataBrokerClient.close")
+        if VehicleDataBrokerClient._instance is self.client:
+            VehicleDataBrokerClient._instance = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self) -> "SyncVehicleDataBrokerClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
@@ -0,0 +1,87 @@
+# Copyright (c) 2022-2025 Contributors to the Eclipse Foundation
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License, Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""A CRITICAL write must not be overwritten by an older write of the same
+path that is still held back by the rate limiter or the write coalescer."""
+
+import asyncio
+
+import pytest
+
+from velocitas_sdk.proto.broker_pb2 import SetDatapointsReply
+from velocitas_sdk.proto.types_pb2 import Datapoint
+from velocitas_sdk.vdb.client import VehicleDataBrokerClient
+from velocitas_sdk.vdb.ratelimit import CRITICAL
+
+BRAKE = "Vehicle.Brake"
+SPEED = "Vehicle.Speed"
+
+
+@pytest.fixture(autouse=True)
+def fresh_client():
+    yield
+    VehicleDataBrokerClient._instance = None
+
+
+def recording_client():
+    """Client whose SetDatapoints requests are recorded instead of sent."""
+    client = VehicleDataBrokerClient()
+    client.broker, client.sent = {}, []
+
+    async def set_datapoints(datapoints):
+        client.sent.append(dict(datapoints))
+        client.broker.update(datapoints)
+        return SetDatapointsReply()
+
+    client._set_datapoints = set_datapoints
+    return client
+
+
+def brake(value: bool) -> Datapoint:
+    return Datapoint(bool_value=value)
+
+
+def test_critical_write_supersedes_write_held_by_rate_limiter():
+    async def run():
+        client = recording_client()
+        client.enable_rate_limiting(path_rate=1, path_burst=1)
+        await client.SetDatapoints({BRAKE: brake(True)})
+        held = asyncio.ensure_future(
+            client.SetDatapoints({BRAKE: brake(False), SPEED: Datapoint(float_value=3)})
+        )
+        await asyncio.sleep(0.05)
+        await client.SetDatapoints({BRAKE: brake(True)}, CRITICAL)
+        await held
+        return client
+
+    client = asyncio.run(run())
+    assert client.broker[BRAKE].bool_value is True
+    assert client.broker[SPEED].float_value == 3
+    assert BRAKE not in client.sent[-1]
+
+
+def test_critical_write_supersedes_write_pending_in_coalescer():
+    async def run():
+        client = recording_client()
+        client.enable_write_coalescing(window=0.05)
+        pending = asyncio.ensure_future(client.SetDatapoints({BRAKE: brake(False)}))
+        await asyncio.sleep(0.01)
+        await client.SetDatapoints({BRAKE: brake(True)}, CRITICAL)
+        await pending
+        return client
+
+    client = asyncio.run(run())
+    assert client.broker[BRAKE].bool_value is True
+    assert client.sent == [{BRAKE: brake(True)}]
+